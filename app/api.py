@@ -6,22 +6,61 @@ with RAG (Retrieval Augmented Generation) support.
 Uses managed identity authentication when deployed to Azure App Service.
 """
 
-from typing import Optional
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Annotated, Any, Optional
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
+import msgspec
+import orjson
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, Field
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from msgspec import Meta
 
 # Import shared RAG service and tracing
-from core import RAGService, RAGResponse, get_settings
+from core import ChatClient, RAGService, RAGResponse, SETTINGS, preview
 from core.tracing import setup_tracing, add_span_attribute, add_span_event
 
+# Configure logging once; messages use lazy %-formatting
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("rag-api")
+
 
 # Global RAG service instance
 rag_service: Optional[RAGService] = None
 
+# Global chat-only client, used for direct chat when no RAG service exists
+chat_client: Optional[ChatClient] = None
+
+# Exact-match response cache for non-streaming /chat requests
+RESPONSE_CACHE_MAX_SIZE = 1024
+_response_cache: "OrderedDict[str, tuple[ChatResponse, str]]" = OrderedDict()
+_response_cache_stats = {"hits": 0, "misses": 0}
+
+# SSE write batching: flush buffered frames at this size or age
+SSE_FLUSH_BYTES = 4096
+SSE_FLUSH_INTERVAL_SECONDS = 0.02
+SSE_DONE_FRAME = b"data: [DONE]\n\n"
+
+# Default minimum characters of streamed text per SSE data frame
+STREAM_BATCH_DEFAULT = 64
+
+# Maximum concurrent warm-up queries issued at startup
+WARM_QUERIES_CONCURRENCY = 10
+
+# Maximum chat requests accepted in one /chat/batch call
+CHAT_BATCH_MAX_SIZE = 32
+
+# Maximum /chat/batch items generating at once, across all batch calls
+CHAT_BATCH_CONCURRENCY = 8
+_chat_batch_semaphore = asyncio.Semaphore(CHAT_BATCH_CONCURRENCY)
+
 
 def get_rag_service() -> RAGService:
     """
@@ -30,37 +69,118 @@ def get_rag_service() -> RAGService:
     global rag_service
     
     if rag_service is None:
-        settings = get_settings()
-        if not settings.azure_openai_endpoint:
+        if not SETTINGS.azure_openai_endpoint:
             raise ValueError("AZURE_OPENAI_ENDPOINT environment variable not set")
-        rag_service = RAGService(settings)
+        rag_service = RAGService(SETTINGS)
     
     return rag_service
 
 
+def get_chat_client() -> ChatClient:
+    """
+    Get a client for direct chat without retrieval.
+    
+    Reuses the RAG service when it exists so both paths share one OpenAI
+    client; otherwise creates a chat-only client with no search clients.
+    """
+    global chat_client
+    
+    if rag_service is not None:
+        return rag_service
+    
+    if chat_client is None:
+        if not SETTINGS.azure_openai_endpoint:
+            raise ValueError("AZURE_OPENAI_ENDPOINT environment variable not set")
+        chat_client = ChatClient(SETTINGS)
+    
+    return chat_client
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib json module."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def load_warm_queries(path: str) -> list[str]:
+    """
+    Read warm-up queries from a newline-delimited file.
+    
+    Blank lines and lines starting with '#' are ignored.
+    """
+    if not path:
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+async def warm_caches(service: RAGService) -> None:
+    """
+    Warm connection pools and the semantic cache before serving traffic.
+    
+    Each query from WARM_QUERIES_PATH runs through the RAG flow and its
+    response is stored in the semantic cache. When the semantic cache is
+    disabled, only retrieval runs so the search index is still warmed.
+    """
+    try:
+        await service.awarm_connections()
+    except Exception as e:
+        logger.warning("Connection warm-up failed: %s", e)
+    
+    try:
+        queries = load_warm_queries(SETTINGS.warm_queries_path)
+    except OSError as e:
+        logger.warning("Could not read warm queries: %s", e)
+        return
+    if not queries:
+        return
+    
+    semaphore = asyncio.Semaphore(WARM_QUERIES_CONCURRENCY)
+    
+    async def warm(query: str) -> None:
+        async with semaphore:
+            # achat stores its answer in the service's semantic cache
+            if service.semantic_cache is None:
+                await service.aget_documents_for_query(query, include_content=False)
+            else:
+                await service.achat(query=query)
+    
+    results = await asyncio.gather(*(warm(query) for query in queries), return_exceptions=True)
+    failures = [r for r in results if isinstance(r, Exception)]
+    logger.info("Warmed %d/%d queries", len(queries) - len(failures), len(queries))
+    if failures:
+        logger.warning("First warm-up failure: %s", failures[0])
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize resources on startup."""
     # Initialize tracing first
-    settings = get_settings()
     tracing_enabled = setup_tracing(
         service_name="rag-api",
-        connection_string=settings.applicationinsights_connection_string
+        connection_string=SETTINGS.applicationinsights_connection_string
     )
     if tracing_enabled:
-        print("✅ Tracing initialized - sending telemetry to Azure Application Insights")
+        logger.info("✅ Tracing initialized - sending telemetry to Azure Application Insights")
     else:
-        print("⚠️ Tracing not enabled - set APPLICATIONINSIGHTS_CONNECTION_STRING to enable")
+        logger.warning("⚠️ Tracing not enabled - set APPLICATIONINSIGHTS_CONNECTION_STRING to enable")
     
     try:
-        get_rag_service()
-        print("RAG service initialized successfully")
+        service = get_rag_service()
+        logger.info("RAG service initialized successfully")
+        await warm_caches(service)
     except Exception as e:
-        print(f"Warning: Failed to initialize RAG service: {e}")
+        logger.warning("RAG init failed: %s", e)
     yield
     # Cleanup on shutdown
-    global rag_service
+    global rag_service, chat_client
+    if rag_service is not None:
+        await rag_service.aclose()
     rag_service = None
+    if chat_client is not None:
+        await chat_client.aclose()
+    chat_client = None
 
 
 # FastAPI app
@@ -68,62 +188,249 @@ app = FastAPI(
     title="Azure OpenAI Chat API with RAG",
     description="REST API for RAG-powered chat interactions with Azure OpenAI",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-# CORS middleware for cross-origin requests
+# CORS middleware for cross-origin requests, restricted to configured origins
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=[origin.strip() for origin in SETTINGS.cors_origins.split(",") if origin.strip()],
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
 )
 
 
 # Request/Response Models
-class Message(BaseModel):
+# msgspec Structs decode and encode without a per-field validation pass;
+# constraints that matter are declared with Meta annotations
+class Message(msgspec.Struct, frozen=True, gc=False):
     """A chat message."""
-    role: str = Field(..., description="Message role: 'user', 'assistant', or 'system'")
-    content: str = Field(..., description="Message content")
+    role: Annotated[str, Meta(description="Message role: 'user', 'assistant', or 'system'")]
+    content: Annotated[str, Meta(description="Message content")]
 
 
-class ChatRequest(BaseModel):
+class ChatRequest(msgspec.Struct, frozen=True):
     """Chat request payload."""
-    message: str = Field(..., description="The user's message")
-    conversation_history: list[Message] = Field(
-        default=[],
-        description="Previous messages in the conversation for context"
-    )
-    system_prompt: str = Field(
-        default="",
-        description="Custom system prompt (leave empty for RAG default)"
-    )
-    max_tokens: int = Field(default=2048, ge=1, le=4096, description="Maximum tokens in response")
-    temperature: float = Field(default=0.7, ge=0, le=2, description="Sampling temperature")
-    use_rag: bool = Field(default=True, description="Whether to use RAG (document retrieval)")
-    top_k: int = Field(default=5, ge=1, le=20, description="Number of documents to retrieve for RAG")
+    message: Annotated[str, Meta(description="The user's message")]
+    conversation_history: Annotated[
+        list[Message],
+        Meta(description="Previous messages in the conversation for context")
+    ] = []
+    system_prompt: Annotated[
+        str,
+        Meta(description="Custom system prompt for direct chat (RAG always uses its own prompt)")
+    ] = ""
+    max_tokens: Annotated[
+        int,
+        Meta(ge=1, le=4096, description="Maximum tokens in response for direct chat (RAG uses the configured value)")
+    ] = 2048
+    temperature: Annotated[
+        float,
+        Meta(ge=0, le=2, description="Sampling temperature for direct chat (RAG uses the configured value)")
+    ] = 0.7
+    use_rag: Annotated[bool, Meta(description="Whether to use RAG (document retrieval)")] = True
+    top_k: Annotated[int, Meta(ge=1, le=20, description="Number of documents to retrieve for RAG")] = 5
+    seed: Annotated[
+        Optional[int],
+        Meta(description="Sampling seed for reproducible responses (enables caching when temperature > 0)")
+    ] = None
+    cache: Annotated[
+        bool,
+        Meta(description="Whether the response may be served from or stored in the response and semantic caches")
+    ] = True
+
+
+class ChatResponse(msgspec.Struct, gc=False):
+    """Chat response payload."""
+    response: Annotated[str, Meta(description="The assistant's response")]
+    model: Annotated[str, Meta(description="Model used for completion")]
+    usage: Annotated[dict, Meta(description="Token usage statistics")] = {}
+    sources: Annotated[list[dict], Meta(description="Retrieved documents (when using RAG)")] = []
 
 
-class ChatResponse(BaseModel):
-    """Chat response payload."""
-    response: str = Field(..., description="The assistant's response")
-    model: str = Field(..., description="Model used for completion")
-    usage: dict = Field(default={}, description="Token usage statistics")
-    sources: list[dict] = Field(default=[], description="Retrieved documents (when using RAG)")
+class ChatBatchRequest(msgspec.Struct, frozen=True):
+    """Batch of independent chat requests answered in one round trip."""
+    requests: Annotated[
+        list[ChatRequest],
+        Meta(min_length=1, max_length=CHAT_BATCH_MAX_SIZE, description="Chat requests, answered concurrently")
+    ]
+
+
+class ChatBatchItem(msgspec.Struct, gc=False):
+    """Result of one request in a batch; exactly one of response or error is set."""
+    response: Annotated[Optional[ChatResponse], Meta(description="Chat response, when the request succeeded")] = None
+    error: Annotated[str, Meta(description="Failure detail, when the request failed")] = ""
+
 
+class ChatBatchResponse(msgspec.Struct, gc=False):
+    """Batch chat response payload."""
+    results: Annotated[list[ChatBatchItem], Meta(description="Results in the order of the batch requests")]
 
-class DocumentResponse(BaseModel):
+
+class DocumentOut(msgspec.Struct, gc=False):
+    """A retrieved document in search results."""
+    title: str
+    source: str
+    page_number: int
+    content: Annotated[str, Meta(description="Document content, truncated to 500 characters")]
+    score: float
+    reranker_score: float
+
+
+class DocumentResponse(msgspec.Struct, gc=False):
     """Document search response."""
-    documents: list[dict] = Field(..., description="Retrieved documents")
-    query: str = Field(..., description="The search query")
+    documents: Annotated[list[DocumentOut], Meta(description="Retrieved documents")]
+    query: Annotated[str, Meta(description="The search query")]
 
 
-class HealthResponse(BaseModel):
+class HealthResponse(msgspec.Struct, gc=False):
     """Health check response."""
     status: str
     endpoint_configured: bool
     model: str
+    cache: Annotated[dict, Meta(description="Response cache statistics")] = {}
+    semantic_cache: Annotated[dict, Meta(description="Semantic cache statistics")] = {}
+
+
+API_MODELS = (ChatRequest, ChatResponse, ChatBatchRequest, ChatBatchResponse, DocumentResponse, HealthResponse)
+
+# Decoder and encoder are built once and reused across requests
+_CHAT_REQUEST_DECODER = msgspec.json.Decoder(ChatRequest)
+_CHAT_BATCH_REQUEST_DECODER = msgspec.json.Decoder(ChatBatchRequest)
+_ENCODER = msgspec.json.Encoder()
+
+
+def _schema_ref(model: type) -> dict:
+    """OpenAPI reference to a model registered in the schema components."""
+    return {"$ref": f"#/components/schemas/{model.__name__}"}
+
+
+def _json_body(model: type) -> dict:
+    """OpenAPI request body for endpoints that decode the body themselves."""
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": _schema_ref(model)}}}}
+
+
+def _json_responses(model: type) -> dict:
+    """OpenAPI 200 response for a model."""
+    return {200: {"content": {"application/json": {"schema": _schema_ref(model)}}}}
+
+
+async def _decode_chat_request(request: Request, decoder: msgspec.json.Decoder = _CHAT_REQUEST_DECODER):
+    """Decode and validate a chat request body, returning 422 on invalid input."""
+    try:
+        return decoder.decode(await request.body())
+    except (msgspec.ValidationError, msgspec.DecodeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _json_response(model: msgspec.Struct, headers: Optional[dict] = None) -> Response:
+    """Return a Struct encoded with the shared msgspec encoder as a JSON response."""
+    return Response(content=_ENCODER.encode(model), media_type="application/json", headers=headers)
+
+
+def _chat_json_response(chat_response: ChatResponse, prefix_cache_key: str = "") -> Response:
+    """Serialize a chat response, exposing the prompt prefix key for proxy routing."""
+    headers = None
+    if prefix_cache_key:
+        headers = {"X-Prefix-Cache-Key": prefix_cache_key}
+    return _json_response(chat_response, headers)
+
+
+def _generation_settings(request: ChatRequest) -> tuple[str, int, float]:
+    """
+    Return the (system_prompt, max_tokens, temperature) a request is generated with.
+    
+    The RAG flow uses its own system prompt and the configured max_tokens
+    and temperature; only direct chat uses the request's values.
+    """
+    if request.use_rag:
+        return "", SETTINGS.max_tokens, SETTINGS.temperature
+    return request.system_prompt, request.max_tokens, request.temperature
+
+
+def _response_cache_key(request: ChatRequest, history: list[dict]) -> Optional[str]:
+    """
+    Build the exact-match cache key for a chat request.
+    
+    The key and the determinism check use the generation settings actually
+    applied, not the request fields the RAG flow ignores. Returns None when
+    the request opts out of caching, or when generation is non-deterministic
+    (temperature > 0 without a seed) and must not be served from cache.
+    """
+    if not request.cache:
+        return None
+    
+    system_prompt, max_tokens, temperature = _generation_settings(request)
+    if temperature > 0 and request.seed is None:
+        return None
+    
+    payload = [
+        " ".join(request.message.split()),
+        tuple((m["role"], m["content"]) for m in history),
+        request.top_k,
+        request.use_rag,
+        system_prompt,
+        max_tokens,
+        temperature,
+        request.seed,
+    ]
+    return hashlib.blake2b(
+        json.dumps(payload, sort_keys=True).encode(),
+        digest_size=16
+    ).hexdigest()
+
+
+def _get_cached_response(key: Optional[str]) -> Optional[tuple[ChatResponse, str]]:
+    """Look up a cached chat response, updating LRU order and hit/miss counters."""
+    if key is None:
+        return None
+    
+    response = _response_cache.get(key)
+    if response is None:
+        _response_cache_stats["misses"] += 1
+        return None
+    
+    _response_cache.move_to_end(key)
+    _response_cache_stats["hits"] += 1
+    return response
+
+
+def _put_cached_response(key: Optional[str], response: tuple[ChatResponse, str]) -> None:
+    """Store a chat response, evicting the least recently used entry when full."""
+    if key is None:
+        return
+    
+    _response_cache[key] = response
+    _response_cache.move_to_end(key)
+    if len(_response_cache) > RESPONSE_CACHE_MAX_SIZE:
+        _response_cache.popitem(last=False)
+
+
+def _document_out(doc, max_content: int = 500) -> DocumentOut:
+    """Convert a retrieved document to a search result with truncated content."""
+    return DocumentOut(
+        title=doc.title,
+        source=doc.source,
+        page_number=doc.page_number,
+        content=preview(doc.content, max_content),
+        score=doc.score,
+        reranker_score=doc.reranker_score
+    )
+
+
+def _sources_from_documents(documents: list) -> list[dict]:
+    """Convert retrieved documents to source dicts for API responses."""
+    return [
+        {
+            "title": doc.title,
+            "source": doc.source,
+            "page_number": doc.page_number,
+            "score": doc.score
+        }
+        for doc in documents
+    ]
 
 
 # API Endpoints
@@ -138,85 +445,48 @@ async def root():
     }
 
 
-@app.get("/health", response_model=HealthResponse, tags=["Health"])
+@app.get("/health", responses=_json_responses(HealthResponse), tags=["Health"])
 async def health_check():
     """
     Health check endpoint.
     
     Returns the service status and configuration state.
     """
-    settings = get_settings()
+    cache = rag_service.semantic_cache if rag_service is not None else None
     
-    return HealthResponse(
+    return _json_response(HealthResponse(
         status="healthy",
-        endpoint_configured=bool(settings.azure_openai_endpoint),
-        model=settings.azure_openai_chat_deployment
-    )
-
-
-@app.post("/chat", response_model=ChatResponse, tags=["Chat"])
-async def chat(request: ChatRequest):
+        endpoint_configured=bool(SETTINGS.azure_openai_endpoint),
+        model=SETTINGS.azure_openai_chat_deployment,
+        cache={
+            **_response_cache_stats,
+            "size": len(_response_cache),
+            "max_size": RESPONSE_CACHE_MAX_SIZE
+        },
+        semantic_cache=await cache.astats() if cache else {}
+    ))
+
+
+@app.post(
+    "/chat",
+    responses=_json_responses(ChatResponse),
+    openapi_extra=_json_body(ChatRequest),
+    tags=["Chat"]
+)
+async def chat(raw_request: Request):
     """
     Send a message and receive a complete response.
     
     Uses RAG by default to retrieve relevant documents before generating a response.
     Set use_rag=false for direct chat without document retrieval.
+    Deterministic requests (a fixed seed, or temperature 0 as applied: the
+    request's for direct chat, the configured one for RAG) are served from
+    an exact-match response cache when possible.
     """
+    request = await _decode_chat_request(raw_request)
+    
     try:
-        service = get_rag_service()
-        settings = get_settings()
-        
-        # Convert conversation history to list of dicts
-        history = [{"role": msg.role, "content": msg.content} for msg in request.conversation_history]
-        
-        if request.use_rag:
-            # Use RAG flow
-            rag_response = service.chat(
-                query=request.message,
-                conversation_history=history,
-                top_k=request.top_k
-            )
-            
-            # Convert documents to dicts for response
-            sources = [
-                {
-                    "title": doc.title,
-                    "source": doc.source,
-                    "page_number": doc.page_number,
-                    "score": doc.score
-                }
-                for doc in rag_response.documents
-            ]
-            
-            return ChatResponse(
-                response=rag_response.answer,
-                model=settings.azure_openai_chat_deployment,
-                usage={},
-                sources=sources
-            )
-        else:
-            # Direct chat without RAG
-            messages = [{"role": "system", "content": request.system_prompt or "You are a helpful AI assistant."}]
-            messages.extend(history)
-            messages.append({"role": "user", "content": request.message})
-            
-            response = service.generate_response(
-                messages=messages,
-                stream=False,
-                max_tokens=request.max_tokens,
-                temperature=request.temperature
-            )
-            
-            return ChatResponse(
-                response=response.choices[0].message.content,
-                model=response.model,
-                usage={
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens
-                },
-                sources=[]
-            )
+        return _chat_json_response(*await _cached_chat(request))
         
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -224,49 +494,212 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=f"Chat completion failed: {str(e)}")
 
 
-@app.post("/chat/stream", tags=["Chat"])
-async def chat_stream(request: ChatRequest):
+@app.post(
+    "/chat/batch",
+    responses=_json_responses(ChatBatchResponse),
+    openapi_extra=_json_body(ChatBatchRequest),
+    tags=["Chat"]
+)
+async def chat_batch(raw_request: Request):
+    """
+    Send several independent messages and receive all responses at once.
+    
+    Each request is answered as by /chat and shares the same response cache;
+    at most CHAT_BATCH_CONCURRENCY items run at once across all batches. A
+    failing request is reported in its own result and does not fail the
+    batch. Lets clients such as the safety evaluation pay one round trip for
+    many queries.
+    """
+    batch = await _decode_chat_request(raw_request, _CHAT_BATCH_REQUEST_DECODER)
+    add_span_attribute("chat.batch_size", len(batch.requests))
+    
+    results = await asyncio.gather(
+        *(_bounded_chat(request) for request in batch.requests),
+        return_exceptions=True
+    )
+    # gather can also return CancelledError, which is not an Exception
+    return _json_response(ChatBatchResponse(results=[
+        ChatBatchItem(error=f"Chat completion failed: {result!r}")
+        if isinstance(result, BaseException) else ChatBatchItem(response=result[0])
+        for result in results
+    ]))
+
+
+async def _bounded_chat(request: ChatRequest) -> tuple[ChatResponse, str]:
+    """Answer one /chat/batch item once a batch concurrency slot is free."""
+    async with _chat_batch_semaphore:
+        return await _cached_chat(request)
+
+
+async def _cached_chat(request: ChatRequest) -> tuple[ChatResponse, str]:
+    """
+    Answer a chat request from the response cache, or run and cache it.
+    
+    Returns the chat response and the prompt prefix cache key ("" without RAG).
+    """
+    # Convert conversation history to list of dicts
+    history = msgspec.to_builtins(request.conversation_history)
+    
+    # Return early on cache hit, before any Azure SDK call
+    cache_key = _response_cache_key(request, history)
+    cached = _get_cached_response(cache_key)
+    if cached is not None:
+        add_span_attribute("cache.hit", True)
+        return cached
+    
+    result = await _chat(request, history)
+    _put_cached_response(cache_key, result)
+    return result
+
+
+async def _chat(request: ChatRequest, history: list[dict]) -> tuple[ChatResponse, str]:
+    """
+    Run the uncached chat flow for a request.
+    
+    Returns the chat response and the prompt prefix cache key ("" without RAG).
+    """
+    if request.use_rag:
+        # Use RAG flow; single-turn queries may be answered from the semantic cache
+        rag_response = await get_rag_service().achat(
+            query=request.message,
+            conversation_history=history,
+            top_k=request.top_k,
+            seed=request.seed,
+            use_cache=request.cache
+        )
+        
+        chat_response = ChatResponse(
+            response=rag_response.answer,
+            model=SETTINGS.azure_openai_chat_deployment,
+            usage={},
+            sources=_sources_from_documents(rag_response.documents)
+        )
+        return chat_response, rag_response.prefix_cache_key
+    else:
+        # Direct chat without RAG
+        messages = [{"role": "system", "content": request.system_prompt or "You are a helpful AI assistant."}]
+        messages.extend(history)
+        messages.append({"role": "user", "content": request.message})
+        
+        response = await get_chat_client().agenerate_response(
+            messages=messages,
+            stream=False,
+            max_tokens=request.max_tokens,
+            temperature=request.temperature,
+            seed=request.seed
+        )
+        
+        chat_response = ChatResponse(
+            response=response.choices[0].message.content,
+            model=response.model,
+            usage={
+                "prompt_tokens": response.usage.prompt_tokens,
+                "completion_tokens": response.usage.completion_tokens,
+                "total_tokens": response.usage.total_tokens
+            },
+            sources=[]
+        )
+        return chat_response, ""
+
+
+def _sse_data_frame(parts: list[str]) -> bytes:
+    """Join buffered text deltas into a single SSE data frame."""
+    return b"data: " + "".join(parts).encode() + b"\n\n"
+
+
+@app.post("/chat/stream", openapi_extra=_json_body(ChatRequest), tags=["Chat"])
+async def chat_stream(
+    raw_request: Request,
+    stream_batch: int = Query(
+        default=STREAM_BATCH_DEFAULT,
+        ge=1,
+        description="Minimum characters per data frame; use 1 for per-token frames"
+    )
+):
     """
     Send a message and receive a streaming response.
     
     Returns a Server-Sent Events (SSE) stream with response chunks.
     Uses RAG by default to retrieve relevant documents before generating.
+    Small model deltas are grouped into frames of at least stream_batch characters.
     """
+    request = await _decode_chat_request(raw_request)
+    
     try:
-        service = get_rag_service()
+        # Direct chat only needs the OpenAI client
+        service = get_rag_service() if request.use_rag else get_chat_client()
         
         # Convert conversation history to list of dicts
-        history = [{"role": msg.role, "content": msg.content} for msg in request.conversation_history]
+        history = msgspec.to_builtins(request.conversation_history)
         
-        async def generate():
+        async def frames():
+            # Group deltas, which are often a single character, into larger frames
+            buffer: list[str] = []
+            size = 0
+            
             if request.use_rag:
                 # Use RAG streaming
-                for chunk, metadata in service.chat_stream(
+                async for chunk, metadata in service.achat_stream(
                     query=request.message,
                     conversation_history=history,
-                    top_k=request.top_k
+                    top_k=request.top_k,
+                    use_cache=request.cache
                 ):
                     if chunk:
-                        yield f"data: {chunk}\n\n"
+                        buffer.append(chunk)
+                        size += len(chunk)
+                        if size >= stream_batch:
+                            yield _sse_data_frame(buffer)
+                            buffer.clear()
+                            size = 0
+                    if metadata:
+                        if buffer:
+                            yield _sse_data_frame(buffer)
+                            buffer.clear()
+                        yield b"data: " + orjson.dumps({
+                            "type": "metadata",
+                            "sources": _sources_from_documents(metadata.documents)
+                        }) + b"\n\n"
             else:
                 # Direct streaming without RAG
                 messages = [{"role": "system", "content": request.system_prompt or "You are a helpful AI assistant."}]
                 messages.extend(history)
                 messages.append({"role": "user", "content": request.message})
                 
-                response = service.generate_response(
+                response = await service.agenerate_response(
                     messages=messages,
                     stream=True,
                     max_tokens=request.max_tokens,
                     temperature=request.temperature
                 )
                 
-                for chunk in response:
+                async for chunk in response:
                     if chunk.choices and chunk.choices[0].delta.content:
                         content = chunk.choices[0].delta.content
-                        yield f"data: {content}\n\n"
+                        buffer.append(content)
+                        size += len(content)
+                        if size >= stream_batch:
+                            yield _sse_data_frame(buffer)
+                            buffer.clear()
+                            size = 0
+                
+                if buffer:
+                    yield _sse_data_frame(buffer)
+        
+        async def generate():
+            # Batch frames into fewer, larger writes
+            buffer = bytearray()
+            last_flush = time.monotonic()
+            async for frame in frames():
+                buffer += frame
+                now = time.monotonic()
+                if len(buffer) >= SSE_FLUSH_BYTES or now - last_flush > SSE_FLUSH_INTERVAL_SECONDS:
+                    yield bytes(buffer)
+                    buffer.clear()
+                    last_flush = now
             
-            yield "data: [DONE]\n\n"
+            buffer += SSE_DONE_FRAME
+            yield bytes(buffer)
         
         return StreamingResponse(
             generate(),
@@ -283,7 +716,7 @@ async def chat_stream(request: ChatRequest):
         raise HTTPException(status_code=500, detail=f"Chat completion failed: {str(e)}")
 
 
-@app.get("/search", response_model=DocumentResponse, tags=["Search"])
+@app.get("/search", responses=_json_responses(DocumentResponse), tags=["Search"])
 async def search_documents(query: str, top_k: int = 5):
     """
     Search for relevant documents without generating a response.
@@ -293,27 +726,46 @@ async def search_documents(query: str, top_k: int = 5):
     try:
         service = get_rag_service()
         
-        documents = service.get_documents_for_query(query, top_k=top_k)
+        documents = await service.aget_documents_for_query(query, top_k=top_k)
         
-        return DocumentResponse(
-            documents=[
-                {
-                    "title": doc.title,
-                    "source": doc.source,
-                    "page_number": doc.page_number,
-                    "content": doc.content[:500] + "..." if len(doc.content) > 500 else doc.content,
-                    "score": doc.score,
-                    "reranker_score": doc.reranker_score
-                }
-                for doc in documents
-            ],
+        return _json_response(DocumentResponse(
+            documents=[_document_out(doc) for doc in documents],
             query=query
-        )
+        ))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 
+def custom_openapi() -> dict:
+    """Build the OpenAPI schema, adding the msgspec model schemas as components."""
+    if app.openapi_schema:
+        return app.openapi_schema
+    
+    schema = get_openapi(
+        title=app.title,
+        version=app.version,
+        description=app.description,
+        routes=app.routes
+    )
+    _, components = msgspec.json.schema_components(API_MODELS, ref_template="#/components/schemas/{name}")
+    schema.setdefault("components", {}).setdefault("schemas", {}).update(components)
+    app.openapi_schema = schema
+    return schema
+
+
+app.openapi = custom_openapi
+
+
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.environ.get("WORKERS", "1")),
+        log_level="warning"
+    )
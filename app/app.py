@@ -14,11 +14,12 @@ RAG Flow:
 Designed to run on Azure App Service with system-assigned managed identity.
 """
 
+import itertools
 import logging
 import streamlit as st
 
 # Import shared RAG service and tracing
-from core import RAGService, get_settings
+from core import RAGService, get_settings, preview
 from core.tracing import setup_tracing
 
 # Configure logging for debugging
@@ -60,27 +61,6 @@ def get_rag_service() -> RAGService:
     return RAGService(settings)
 
 
-def format_citations_for_display(documents: list) -> str:
-    """
-    Format retrieved documents for display in the sidebar.
-    """
-    if not documents:
-        return "No documents retrieved."
-    
-    citations = []
-    for i, doc in enumerate(documents, 1):
-        source_info = f"**{i}. {doc.title or 'Untitled'}**"
-        if doc.source:
-            source_info += f"\n   📄 {doc.source}"
-        if doc.page_number:
-            source_info += f" (Page {doc.page_number})"
-        if doc.reranker_score:
-            source_info += f"\n   🎯 Relevance: {doc.reranker_score:.2f}"
-        citations.append(source_info)
-    
-    return "\n\n".join(citations)
-
-
 def main():
     # Get settings for display
     settings = get_settings()
@@ -125,25 +105,25 @@ def main():
                     for msg in st.session_state.messages[:-1]
                 ]
                 
-                # Use RAG service for streaming response
+                # Stream the response; the service retrieves documents once and
+                # replays answers to similar first-turn questions from its semantic cache
                 with st.spinner("🔍 Searching documents..."):
-                    # Get initial documents for display
-                    documents = rag_service.get_documents_for_query(prompt)
-                    st.session_state.last_documents = documents
-                    st.session_state.debug_search_count = len(documents)
+                    stream = rag_service.chat_stream(
+                        query=prompt,
+                        conversation_history=conversation_history
+                    )
+                    first = next(stream, ("", None))
                 
-                # Stream the response
-                final_metadata = None
-                for chunk, metadata in rag_service.chat_stream(
-                    query=prompt,
-                    conversation_history=conversation_history
-                ):
+                for chunk, metadata in itertools.chain([first], stream):
                     if chunk:
                         full_response += chunk
                         message_placeholder.markdown(full_response + "▌")
                     if metadata:
-                        final_metadata = metadata
-                        # Store debug info
+                        # Store retrieved documents and debug info
+                        st.session_state.last_documents = metadata.documents
+                        # Rendered once here; reruns reuse the stored markdown
+                        st.session_state.last_citations = metadata.citations_display
+                        st.session_state.debug_search_count = len(metadata.documents)
                         st.session_state.debug_sources = metadata.sources_text
                         st.session_state.debug_system_prompt = metadata.system_prompt
                 
@@ -179,6 +159,7 @@ def main():
         if st.button("🗑️ Clear Chat", use_container_width=True):
             st.session_state.messages = []
             st.session_state.last_documents = []
+            st.session_state.last_citations = ""
             st.rerun()
         
         st.markdown("---")
@@ -195,7 +176,7 @@ def main():
             st.markdown("---")
             st.subheader("📚 Retrieved Sources")
             with st.expander("View sources", expanded=True):
-                st.markdown(format_citations_for_display(st.session_state.last_documents))
+                st.markdown(st.session_state.get("last_citations", ""))
         
         # Debug section
         st.markdown("---")
@@ -211,12 +192,12 @@ def main():
             st.metric("Sources Text Length", f"{sources_len} chars")
             
             with st.expander("View raw sources sent to LLM", expanded=False):
-                st.code(st.session_state.debug_sources[:2000] + "..." if sources_len > 2000 else st.session_state.debug_sources)
+                st.code(preview(st.session_state.debug_sources, 2000))
         
         # Show system prompt
         if st.session_state.get("debug_system_prompt"):
             with st.expander("View full system prompt", expanded=False):
-                st.code(st.session_state.debug_system_prompt[:3000] + "..." if len(st.session_state.debug_system_prompt) > 3000 else st.session_state.debug_system_prompt)
+                st.code(preview(st.session_state.debug_system_prompt, 3000))
 
 
 if __name__ == "__main__":
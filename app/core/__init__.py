@@ -5,17 +5,26 @@ This package contains shared functionality used by both the Streamlit UI (app.py
 and FastAPI service (api.py).
 """
 
-from .config import Settings, get_settings
-from .rag import RAGService, RAGResponse
-from .tracing import setup_tracing, get_tracer, add_span_attribute, add_span_event
+from .config import Settings, SETTINGS, get_settings
+from .rag import ChatClient, RAGService, RAGResponse, preview
+from .semantic_cache import SemanticCache
+from .shared_cache import SharedCache
+from .tracing import setup_tracing, get_tracer, maybe_span, add_span_attribute, set_span_attributes, add_span_event
 
 __all__ = [
     "Settings", 
+    "SETTINGS",
     "get_settings", 
+    "ChatClient",
     "RAGService", 
     "RAGResponse",
+    "preview",
+    "SemanticCache",
+    "SharedCache",
     "setup_tracing",
     "get_tracer",
+    "maybe_span",
     "add_span_attribute",
+    "set_span_attributes",
     "add_span_event"
 ]
@@ -4,10 +4,8 @@ Configuration management for the RAG application.
 Centralizes all environment variables and settings using Pydantic.
 """
 
-import os
-from functools import lru_cache
 from pydantic import Field
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -24,10 +22,20 @@ class Settings(BaseSettings):
         alias="AZURE_OPENAI_CHAT_DEPLOYMENT",
         description="Chat model deployment name"
     )
+    azure_openai_embedding_deployment: str = Field(
+        default="text-embedding-3-large",
+        alias="AZURE_EMBEDDING_MODEL",
+        description="Embedding model deployment name (used by the semantic cache)"
+    )
     azure_openai_api_version: str = Field(
         default="2024-10-21",
         description="Azure OpenAI API version"
     )
+    azure_client_id: str = Field(
+        default="",
+        alias="AZURE_CLIENT_ID",
+        description="Client ID of the user-assigned managed identity (empty for system-assigned)"
+    )
     
     # Azure AI Search
     azure_ai_search_endpoint: str = Field(
@@ -58,6 +66,43 @@ class Settings(BaseSettings):
         default="embedding",
         description="Name of the vector field in search index"
     )
+    search_reuse_query_embedding: bool = Field(
+        default=False,
+        description="Send the semantic cache's query embedding to vector search instead of "
+                    "re-embedding the query in the index vectorizer (needs the same embedding deployment)"
+    )
+    max_source_tokens: int = Field(
+        default=8000,
+        description="Token budget for retrieved sources in the system prompt"
+    )
+    
+    # Semantic cache
+    semantic_cache_enabled: bool = Field(
+        default=True,
+        description="Whether to serve near-duplicate queries from the semantic cache"
+    )
+    semantic_cache_threshold: float = Field(
+        default=0.92,
+        description="Minimum cosine similarity for a semantic cache hit"
+    )
+    semantic_cache_max_entries: int = Field(
+        default=1024,
+        description="Maximum number of entries held in the semantic cache"
+    )
+    semantic_cache_ttl_seconds: int = Field(
+        default=3600,
+        description="Seconds a cached answer stays valid in the semantic cache"
+    )
+    redis_url: str = Field(
+        default="",
+        alias="REDIS_URL",
+        description="Optional Redis URL; when set, workers share one semantic and embedding cache"
+    )
+    warm_queries_path: str = Field(
+        default="",
+        alias="WARM_QUERIES_PATH",
+        description="Optional newline-delimited file of queries used to warm caches at API startup"
+    )
     
     # Model parameters
     max_tokens: int = Field(
@@ -69,6 +114,13 @@ class Settings(BaseSettings):
         description="Sampling temperature for generation"
     )
     
+    # API
+    cors_origins: str = Field(
+        default="*",
+        alias="CORS_ORIGINS",
+        description="Comma-separated list of origins allowed to call the API"
+    )
+    
     # Application Insights (optional)
     applicationinsights_connection_string: str = Field(
         default="",
@@ -76,17 +128,24 @@ class Settings(BaseSettings):
         description="Application Insights connection string for telemetry"
     )
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        extra = "ignore"
+    # Settings are read-only after load, so skip assignment validation
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+        frozen=True,
+        validate_assignment=False
+    )
+
+
+# Settings are loaded once at import time and shared by all callers
+SETTINGS: Settings = Settings()
 
 
-@lru_cache()
 def get_settings() -> Settings:
     """
-    Get cached application settings.
+    Get application settings.
     
-    Uses lru_cache to ensure settings are only loaded once.
+    Returns the module-level settings instance loaded at import time.
     """
-    return Settings()
+    return SETTINGS
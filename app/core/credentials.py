@@ -0,0 +1,146 @@
+"""
+Azure credentials for the RAG application.
+
+DefaultAzureCredential probes every credential source (environment, workload
+identity, managed identity, Azure CLI, ...) in turn on the first token fetch.
+The app only ever runs with a managed identity in Azure or with developer
+credentials locally, so the credential is picked up front:
+
+- In Azure (IDENTITY_ENDPOINT or MSI_ENDPOINT set by the platform), a
+  ManagedIdentityCredential using AZURE_CLIENT_ID when configured
+- Elsewhere, environment service principal credentials followed by the
+  Azure CLI login
+
+Tokens are cached per scope and reused until five minutes before expiry.
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+from azure.core.credentials import AccessToken
+from azure.identity import (
+    AzureCliCredential,
+    ChainedTokenCredential,
+    EnvironmentCredential,
+    ManagedIdentityCredential,
+)
+from azure.identity.aio import (
+    AzureCliCredential as AsyncAzureCliCredential,
+    ChainedTokenCredential as AsyncChainedTokenCredential,
+    EnvironmentCredential as AsyncEnvironmentCredential,
+    ManagedIdentityCredential as AsyncManagedIdentityCredential,
+)
+
+from .config import Settings
+
+# Refresh cached tokens this many seconds before they expire
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+
+def running_with_managed_identity() -> bool:
+    """Whether the Azure platform exposes a managed identity endpoint to this process."""
+    return bool(os.environ.get("IDENTITY_ENDPOINT") or os.environ.get("MSI_ENDPOINT"))
+
+
+class CachedTokenCredential:
+    """
+    Credential wrapper that caches access tokens per scope.
+    
+    Usage:
+        credential = CachedTokenCredential(ManagedIdentityCredential())
+        token = credential.get_token("https://search.azure.com/.default")
+    """
+    
+    def __init__(self, credential):
+        """
+        Initialize the wrapper.
+        
+        Args:
+            credential: Sync azure-identity credential that fetches tokens
+        """
+        self._credential = credential
+        self._tokens: dict[tuple, AccessToken] = {}
+        self._lock = threading.Lock()
+    
+    def get_token(self, *scopes: str, **kwargs) -> AccessToken:
+        """Return a cached token for the scopes, fetching a new one near expiry."""
+        key = (scopes, kwargs.get("claims"), kwargs.get("tenant_id"))
+        with self._lock:
+            token = self._tokens.get(key)
+            if token is None or token.expires_on - TOKEN_REFRESH_MARGIN_SECONDS <= time.time():
+                token = self._credential.get_token(*scopes, **kwargs)
+                self._tokens[key] = token
+            return token
+    
+    def close(self) -> None:
+        """Close the wrapped credential."""
+        self._credential.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class AsyncCachedTokenCredential:
+    """Async version of CachedTokenCredential."""
+    
+    def __init__(self, credential):
+        """
+        Initialize the wrapper.
+        
+        Args:
+            credential: Async azure-identity credential that fetches tokens
+        """
+        self._credential = credential
+        self._tokens: dict[tuple, AccessToken] = {}
+        self._lock = asyncio.Lock()
+    
+    async def get_token(self, *scopes: str, **kwargs) -> AccessToken:
+        """Return a cached token for the scopes, fetching a new one near expiry."""
+        key = (scopes, kwargs.get("claims"), kwargs.get("tenant_id"))
+        async with self._lock:
+            token = self._tokens.get(key)
+            if token is None or token.expires_on - TOKEN_REFRESH_MARGIN_SECONDS <= time.time():
+                token = await self._credential.get_token(*scopes, **kwargs)
+                self._tokens[key] = token
+            return token
+    
+    async def close(self) -> None:
+        """Close the wrapped credential."""
+        await self._credential.close()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+
+def create_credential(settings: Settings) -> CachedTokenCredential:
+    """
+    Create the sync credential for this environment.
+    
+    Args:
+        settings: Application settings (for the managed identity client ID)
+    
+    Returns:
+        Token-caching credential
+    """
+    if running_with_managed_identity():
+        credential = ManagedIdentityCredential(client_id=settings.azure_client_id or None)
+    else:
+        credential = ChainedTokenCredential(EnvironmentCredential(), AzureCliCredential())
+    return CachedTokenCredential(credential)
+
+
+def create_async_credential(settings: Settings) -> AsyncCachedTokenCredential:
+    """Async version of create_credential."""
+    if running_with_managed_identity():
+        credential = AsyncManagedIdentityCredential(client_id=settings.azure_client_id or None)
+    else:
+        credential = AsyncChainedTokenCredential(AsyncEnvironmentCredential(), AsyncAzureCliCredential())
+    return AsyncCachedTokenCredential(credential)
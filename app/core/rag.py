@@ -13,25 +13,84 @@ RAG Flow:
 5. Response with citations
 """
 
+import asyncio
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Optional, Generator, Any
+from functools import cached_property, lru_cache
+from typing import Optional, Generator, AsyncGenerator, Any
 
-from openai import AzureOpenAI
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+import aiohttp
+import httpx
+import numpy as np
+from azure.core.pipeline.transport import AioHttpTransport
+from openai import AzureOpenAI, AsyncAzureOpenAI
+from azure.identity import get_bearer_token_provider
+from azure.identity.aio import get_bearer_token_provider as get_async_bearer_token_provider
 from azure.search.documents import SearchClient
-from azure.search.documents.models import VectorizableTextQuery, QueryType
+from azure.search.documents.aio import SearchClient as AsyncSearchClient
+from azure.search.documents.models import VectorizableTextQuery, VectorizedQuery, QueryType
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
 
 from .config import Settings, get_settings
+from .credentials import (
+    CachedTokenCredential,
+    AsyncCachedTokenCredential,
+    create_credential,
+    create_async_credential
+)
+from .semantic_cache import SemanticCache
 from .tracing import (
-    get_tracer, 
+    maybe_span, 
     add_span_attribute, 
+    set_span_attributes, 
     add_span_event, 
     record_exception
 )
 
 logger = logging.getLogger(__name__)
 
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+# Connection pool limits for the async Azure OpenAI and Azure AI Search clients
+HTTP_MAX_CONNECTIONS = 128
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 64
+HTTP_TIMEOUT_SECONDS = 30.0
+
+# Reciprocal Rank Fusion constant and candidates fetched per result when text
+# and vector searches are fused locally (semantic ranker off)
+RRF_K = 60
+RRF_CANDIDATE_MULTIPLIER = 2
+
+# Runs the text and vector halves of a locally fused sync search in parallel
+_search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="search")
+
+# Number of recent query embeddings kept per client
+QUERY_EMBEDDING_CACHE_SIZE = 256
+
+# Fields returned by search; citation-only lookups skip the content field
+SEARCH_SELECT_FIELDS = ["content", "title", "source", "page_number"]
+SEARCH_CITATION_FIELDS = ["title", "source", "page_number"]
+
+# Number of retrieved documents recorded individually on the search span,
+# and their precomputed (source, title, page, score, content) attribute keys
+TRACED_DOCUMENT_COUNT = 5
+_DOC_ATTR_KEYS = [
+    tuple(f"search.doc_{i}.{name}" for name in ("source", "title", "page", "score", "content"))
+    for i in range(1, TRACED_DOCUMENT_COUNT + 1)
+]
+
+# HTTP/2 client shared by every async Azure OpenAI client in the process
+_async_http_client: Optional[httpx.AsyncClient] = None
+
 
 # RAG System Prompt - based on azure-search-openai-demo pattern
 RAG_SYSTEM_PROMPT = """You are an intelligent assistant helping users with questions based on the provided documents.
@@ -45,8 +104,12 @@ Use square brackets to reference the source, for example [source1.pdf]. Don't co
 {sources}
 """
 
+# The default prompt split around its single {sources} placeholder, so the
+# system message is built by concatenation instead of str.format
+RAG_SYSTEM_PROMPT_HEAD, RAG_SYSTEM_PROMPT_TAIL = RAG_SYSTEM_PROMPT.split("{sources}")
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class Document:
     """A retrieved document from the search index."""
     content: str
@@ -57,6 +120,44 @@ class Document:
     reranker_score: float = 0.0
 
 
+def preview(text: str, limit: int) -> str:
+    """
+    Shorten text for display, marking truncation with "...".
+    
+    Slicing past the end returns the string itself, so only one slice of
+    limit + 1 characters is needed to tell whether anything was cut.
+    """
+    head = text[:limit + 1]
+    return head if len(head) <= limit else head[:limit] + "..."
+
+
+def format_citations(documents: list[Document]) -> str:
+    """
+    Format retrieved documents for display as citations.
+    
+    Args:
+        documents: List of retrieved documents
+        
+    Returns:
+        Formatted citations string for UI display
+    """
+    if not documents:
+        return "No documents retrieved."
+    
+    citations = []
+    for i, doc in enumerate(documents, 1):
+        source_info = f"**{i}. {doc.title or 'Untitled'}**"
+        if doc.source:
+            source_info += f"\n   📄 {doc.source}"
+        if doc.page_number:
+            source_info += f" (Page {doc.page_number})"
+        if doc.reranker_score:
+            source_info += f"\n   🎯 Relevance: {doc.reranker_score:.2f}"
+        citations.append(source_info)
+    
+    return "\n\n".join(citations)
+
+
 @dataclass
 class RAGResponse:
     """Response from the RAG service."""
@@ -64,9 +165,457 @@ class RAGResponse:
     documents: list[Document] = field(default_factory=list)
     sources_text: str = ""
     system_prompt: str = ""
+    prefix_cache_key: str = ""
+    
+    @cached_property
+    def citations_display(self) -> str:
+        """Citations for the retrieved documents, formatted once per response."""
+        return format_citations(self.documents)
+
+
+def document_hash(document: Document) -> str:
+    """Stable content hash of a document, independent of retrieval rank."""
+    return hashlib.blake2b(document.content.encode(), digest_size=16).hexdigest()
+
+
+def prefix_cache_key(documents: list[Document]) -> str:
+    """
+    Key identifying the set of documents in a RAG prompt.
+    
+    Requests that retrieve the same documents (in any order) share the same
+    prompt prefix, so this key can be used to route them to the same replica.
+    """
+    return _prefix_key_from_hashes(sorted(document_hash(doc) for doc in documents))
+
 
+def _prefix_key_from_hashes(sorted_hashes: list[str]) -> str:
+    """Combine sorted document hashes into a prefix cache key."""
+    return hashlib.blake2b("".join(sorted_hashes).encode(), digest_size=16).hexdigest()
 
-class RAGService:
+
+def rrf_fuse(*ranked_results: list[dict], k: int = RRF_K, top: Optional[int] = None) -> list[dict]:
+    """
+    Merge ranked search result lists with Reciprocal Rank Fusion.
+    
+    Each result scores sum(1 / (k + rank)) over the lists it appears in,
+    matching the fusion Azure AI Search applies to hybrid queries.
+    
+    Args:
+        ranked_results: Search result dicts, best first, each with an "id" key
+        k: RRF constant; larger values flatten the rank contribution
+        top: Number of fused results to return (all when None)
+        
+    Returns:
+        Fused results, best first, with "@search.score" set to the RRF score
+    """
+    scores: dict[str, float] = {}
+    results: dict[str, dict] = {}
+    for ranked in ranked_results:
+        for rank, result in enumerate(ranked, 1):
+            key = result["id"]
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            results.setdefault(key, result)
+    
+    fused = sorted(scores, key=scores.__getitem__, reverse=True)[:top]
+    return [{**results[key], "@search.score": scores[key]} for key in fused]
+
+
+@lru_cache(maxsize=1)
+def _get_token_encoder():
+    """Return the gpt-4o tokenizer, or None when tiktoken or its encoding data is unavailable."""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.encoding_for_model("gpt-4o")
+    except Exception as e:
+        logger.warning(f"⚠️  Could not load tiktoken encoding, estimating tokens from length: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count prompt tokens in a text, estimating ~4 characters per token without tiktoken."""
+    encoder = _get_token_encoder()
+    if encoder is None:
+        return len(text) // 4 + 1
+    return len(encoder.encode_ordinary(text))
+
+
+def _get_async_http_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide HTTP/2 client for Azure OpenAI.
+    
+    Concurrent embedding and chat requests are multiplexed over one pooled
+    TLS connection instead of opening a connection each. The client is
+    recreated if a previous owner closed it.
+    """
+    global _async_http_client
+    
+    if _async_http_client is None or _async_http_client.is_closed:
+        _async_http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            timeout=HTTP_TIMEOUT_SECONDS
+        )
+    return _async_http_client
+
+
+@lru_cache(maxsize=1)
+def _get_clients(settings: Settings) -> tuple[CachedTokenCredential, AzureOpenAI]:
+    """
+    Create the sync Azure credential and OpenAI client once per settings.
+    
+    The clients are thread-safe, so every ChatClient/RAGService built from the
+    same settings shares them.
+    
+    Returns:
+        Tuple of (credential, openai_client)
+    """
+    if not settings.azure_openai_endpoint:
+        raise ValueError("AZURE_OPENAI_ENDPOINT environment variable not set")
+    
+    credential = create_credential(settings)
+    token_provider = get_bearer_token_provider(credential, COGNITIVE_SERVICES_SCOPE)
+    
+    openai_client = AzureOpenAI(
+        azure_endpoint=settings.azure_openai_endpoint,
+        azure_ad_token_provider=token_provider,
+        api_version=settings.azure_openai_api_version
+    )
+    return credential, openai_client
+
+
+@lru_cache(maxsize=1)
+def _get_search_client(settings: Settings) -> SearchClient:
+    """Create the sync Azure AI Search client once per settings."""
+    if not settings.azure_ai_search_endpoint:
+        raise ValueError("AZURE_AI_SEARCH_ENDPOINT environment variable not set")
+    
+    credential, _ = _get_clients(settings)
+    return SearchClient(
+        endpoint=settings.azure_ai_search_endpoint,
+        index_name=settings.azure_search_index_name,
+        credential=credential
+    )
+
+
+class ChatClient:
+    """
+    Azure OpenAI chat client without retrieval.
+    
+    Holds the OpenAI clients and credentials only, so chat-only callers do not
+    create Azure AI Search clients. RAGService extends it with retrieval.
+    
+    Usage:
+        client = ChatClient(get_settings())
+        response = client.generate_response([{"role": "user", "content": "Hello"}])
+        print(response.choices[0].message.content)
+    """
+    
+    def __init__(self, settings: Optional[Settings] = None):
+        """
+        Initialize the chat client.
+        
+        Args:
+            settings: Application settings. If None, loads from environment.
+        """
+        self.settings = settings or get_settings()
+        
+        # Sync clients are created up front so the first request does not pay
+        # for client construction
+        self.credential, self.openai_client = _get_clients(self.settings)
+        
+        # Recent query embeddings, so every consumer of one query shares one call
+        self._query_embeddings: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._query_embeddings_lock = threading.Lock()
+        
+        # Async clients used by the FastAPI service
+        self._async_openai_client: Optional[AsyncAzureOpenAI] = None
+        self._async_credential: Optional[AsyncCachedTokenCredential] = None
+        self._async_http_client: Optional[httpx.AsyncClient] = None
+    
+    @property
+    def async_credential(self) -> AsyncCachedTokenCredential:
+        """Get or create async Azure credential."""
+        if self._async_credential is None:
+            self._async_credential = create_async_credential(self.settings)
+        return self._async_credential
+    
+    @property
+    def async_openai_client(self) -> AsyncAzureOpenAI:
+        """Get or create async Azure OpenAI client with a pooled HTTP connection."""
+        if self._async_openai_client is None:
+            if not self.settings.azure_openai_endpoint:
+                raise ValueError("AZURE_OPENAI_ENDPOINT environment variable not set")
+            
+            token_provider = get_async_bearer_token_provider(
+                self.async_credential,
+                COGNITIVE_SERVICES_SCOPE
+            )
+            
+            # Shared HTTP/2 pool so concurrent requests reuse keep-alive connections
+            self._async_http_client = _get_async_http_client()
+            
+            self._async_openai_client = AsyncAzureOpenAI(
+                azure_endpoint=self.settings.azure_openai_endpoint,
+                azure_ad_token_provider=token_provider,
+                api_version=self.settings.azure_openai_api_version,
+                http_client=self._async_http_client
+            )
+        return self._async_openai_client
+    
+    async def awarm_connections(self) -> None:
+        """
+        Open the Azure OpenAI connection ahead of traffic.
+        
+        Acquires an access token and sends a HEAD request through the pooled
+        OpenAI HTTP client, so DNS, TLS handshakes and token fetches are paid
+        before the first user.
+        """
+        await self.async_credential.get_token(COGNITIVE_SERVICES_SCOPE)
+        
+        openai_client = self.async_openai_client
+        await self._async_http_client.head(self.settings.azure_openai_endpoint)
+        logger.info(f"🔌 Warmed connection to {openai_client.base_url.host}")
+    
+    async def aclose(self) -> None:
+        """Close async clients and their connection pools."""
+        if self._async_openai_client is not None:
+            await self._async_openai_client.close()
+            self._async_openai_client = None
+            self._async_http_client = None
+        if self._async_credential is not None:
+            await self._async_credential.close()
+            self._async_credential = None
+    
+    def _recall_embedding(self, query: str) -> Optional[np.ndarray]:
+        """Return the remembered embedding for a query, or None."""
+        with self._query_embeddings_lock:
+            embedding = self._query_embeddings.get(query)
+            if embedding is not None:
+                self._query_embeddings.move_to_end(query)
+            return embedding
+    
+    def _remember_embedding(self, query: str, data: list[float]) -> np.ndarray:
+        """Normalize an embedding to a unit float32 vector and remember it for the query."""
+        embedding = np.asarray(data, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if norm:
+            embedding /= norm
+        # Shared between callers, so guard against in-place edits
+        embedding.flags.writeable = False
+        
+        with self._query_embeddings_lock:
+            self._query_embeddings[query] = embedding
+            if len(self._query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_embeddings.popitem(last=False)
+        return embedding
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query with the configured Azure OpenAI embedding deployment.
+        
+        Recent queries are answered from a small per-client cache, so the
+        semantic cache, vector search and any other consumer share one call.
+        
+        Args:
+            query: Text to embed
+            
+        Returns:
+            Query embedding as a unit-length float32 vector
+        """
+        embedding = self._recall_embedding(query)
+        if embedding is not None:
+            return embedding
+        
+        response = self.openai_client.embeddings.create(
+            model=self.settings.azure_openai_embedding_deployment,
+            input=[query]
+        )
+        return self._remember_embedding(query, response.data[0].embedding)
+    
+    async def aembed_query(self, query: str) -> np.ndarray:
+        """
+        Async version of embed_query.
+        
+        Args:
+            query: Text to embed
+            
+        Returns:
+            Query embedding as a unit-length float32 vector
+        """
+        embedding = self._recall_embedding(query)
+        if embedding is not None:
+            return embedding
+        
+        response = await self.async_openai_client.embeddings.create(
+            model=self.settings.azure_openai_embedding_deployment,
+            input=[query]
+        )
+        return self._remember_embedding(query, response.data[0].embedding)
+    
+    def generate_response(
+        self,
+        messages: list[dict],
+        stream: bool = False,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        seed: Optional[int] = None
+    ) -> Any:
+        """
+        Generate a response from Azure OpenAI.
+        
+        Args:
+            messages: List of message dicts for the API
+            stream: Whether to stream the response
+            max_tokens: Maximum tokens in response (defaults to settings)
+            temperature: Sampling temperature (defaults to settings)
+            seed: Optional sampling seed for reproducible responses
+            
+        Returns:
+            OpenAI response object (streaming or complete)
+        """
+        # Start tracing span for LLM generation
+        with maybe_span("generate_response") as span:
+            try:
+                completion_params = self._build_completion_params(messages, stream, max_tokens, temperature, seed, span)
+                
+                response = self.openai_client.chat.completions.create(**completion_params)
+                
+                if span is not None:
+                    self._record_completion(response, stream)
+                
+                return response
+                
+            except Exception as e:
+                record_exception(e)
+                raise
+    
+    async def agenerate_response(
+        self,
+        messages: list[dict],
+        stream: bool = False,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        seed: Optional[int] = None
+    ) -> Any:
+        """
+        Async version of generate_response using the async Azure OpenAI client.
+        
+        Args:
+            messages: List of message dicts for the API
+            stream: Whether to stream the response
+            max_tokens: Maximum tokens in response (defaults to settings)
+            temperature: Sampling temperature (defaults to settings)
+            seed: Optional sampling seed for reproducible responses
+            
+        Returns:
+            OpenAI response object (async stream or complete)
+        """
+        # Start tracing span for LLM generation
+        with maybe_span("generate_response") as span:
+            try:
+                completion_params = self._build_completion_params(messages, stream, max_tokens, temperature, seed, span)
+                
+                response = await self.async_openai_client.chat.completions.create(**completion_params)
+                
+                if span is not None:
+                    self._record_completion(response, stream)
+                
+                return response
+                
+            except Exception as e:
+                record_exception(e)
+                raise
+    
+    def _build_completion_params(
+        self,
+        messages: list[dict],
+        stream: bool,
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        seed: Optional[int],
+        span: Any
+    ) -> dict:
+        """
+        Build chat completion parameters and record them on the current span.
+        
+        Args:
+            messages: List of message dicts for the API
+            stream: Whether to stream the response
+            max_tokens: Maximum tokens in response (defaults to settings)
+            temperature: Sampling temperature (defaults to settings)
+            seed: Optional sampling seed for reproducible responses
+            span: Recording span from maybe_span, or None to skip attributes
+            
+        Returns:
+            Keyword arguments for chat.completions.create
+        """
+        deployment = self.settings.azure_openai_chat_deployment
+        max_tokens = max_tokens or self.settings.max_tokens
+        temperature = temperature if temperature is not None else self.settings.temperature
+        
+        logger.info(f"🤖 RAG STEP 4: Calling OpenAI model: {deployment}")
+        logger.info(f"   Message count: {len(messages)}, Stream: {stream}")
+        
+        if span is not None:
+            # Add generation parameters as span attributes
+            attributes = {
+                "gen_ai.system": "azure_openai",
+                "gen_ai.request.model": deployment,
+                "gen_ai.request.max_tokens": max_tokens,
+                "gen_ai.request.temperature": temperature,
+                "gen_ai.request.streaming": stream,
+                "gen_ai.request.seed": seed,
+                "gen_ai.request.message_count": len(messages),
+                # Approximate input size
+                "gen_ai.request.input_chars": sum(len(m.get("content", "")) for m in messages),
+            }
+            
+            # Add actual message content to trace
+            for i, msg in enumerate(messages):
+                attributes[f"gen_ai.request.message_{i}.role"] = msg.get("role", "unknown")
+                # Truncate very long messages (system prompt can be large)
+                attributes[f"gen_ai.request.message_{i}.content"] = msg.get("content", "")[:10000]
+            set_span_attributes(attributes)
+            
+            add_span_event("llm_call_started", {"model": deployment, "stream": stream})
+        
+        completion_params = {
+            "model": deployment,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": stream,
+        }
+        
+        # Only send a seed when one was requested
+        if seed is not None:
+            completion_params["seed"] = seed
+        
+        return completion_params
+    
+    @staticmethod
+    def _record_completion(response: Any, stream: bool) -> None:
+        """Record token usage and response content on the current span."""
+        attributes = {}
+        if not stream and hasattr(response, 'usage'):
+            attributes["gen_ai.response.prompt_tokens"] = response.usage.prompt_tokens
+            attributes["gen_ai.response.completion_tokens"] = response.usage.completion_tokens
+            attributes["gen_ai.response.total_tokens"] = response.usage.total_tokens
+        
+        # Add actual response content for non-streaming
+        if not stream and response.choices:
+            attributes["gen_ai.response.content"] = response.choices[0].message.content or ""
+            attributes["gen_ai.response.finish_reason"] = response.choices[0].finish_reason
+        set_span_attributes(attributes)
+        
+        add_span_event("llm_call_completed")
+
+
+class RAGService(ChatClient):
     """
     RAG (Retrieval Augmented Generation) Service.
     
@@ -75,6 +624,9 @@ class RAGService:
     - Response generation with Azure OpenAI
     - Source formatting and citation handling
     
+    Single-turn queries are answered from a semantic cache when a similar
+    question was answered recently, skipping search and generation.
+    
     Usage:
         settings = get_settings()
         rag = RAGService(settings)
@@ -88,6 +640,9 @@ class RAGService:
             print(chunk, end="")
     """
     
+    # Size of the pieces a cached answer is replayed in when streaming
+    CACHED_STREAM_CHUNK_SIZE = 40
+    
     def __init__(self, settings: Optional[Settings] = None):
         """
         Initialize the RAG service.
@@ -95,56 +650,86 @@ class RAGService:
         Args:
             settings: Application settings. If None, loads from environment.
         """
-        self.settings = settings or get_settings()
-        self._openai_client: Optional[AzureOpenAI] = None
-        self._search_client: Optional[SearchClient] = None
-        self._credential: Optional[DefaultAzureCredential] = None
+        super().__init__(settings)
+        self.search_client = _get_search_client(self.settings)
+        self._async_search_client: Optional[AsyncSearchClient] = None
+        self.semantic_cache = self._create_semantic_cache()
     
-    @property
-    def credential(self) -> DefaultAzureCredential:
-        """Get or create Azure credential."""
-        if self._credential is None:
-            self._credential = DefaultAzureCredential()
-        return self._credential
-    
-    @property
-    def openai_client(self) -> AzureOpenAI:
-        """Get or create Azure OpenAI client."""
-        if self._openai_client is None:
-            if not self.settings.azure_openai_endpoint:
-                raise ValueError("AZURE_OPENAI_ENDPOINT environment variable not set")
-            
-            token_provider = get_bearer_token_provider(
-                self.credential,
-                "https://cognitiveservices.azure.com/.default"
-            )
-            
-            self._openai_client = AzureOpenAI(
-                azure_endpoint=self.settings.azure_openai_endpoint,
-                azure_ad_token_provider=token_provider,
-                api_version=self.settings.azure_openai_api_version
+    def _create_semantic_cache(self) -> Optional[SemanticCache]:
+        """
+        Create the semantic cache configured in settings.
+        
+        Returns a Redis-backed SharedCache when REDIS_URL is set, an in-process
+        SemanticCache otherwise, or None when the cache is disabled.
+        """
+        if not self.settings.semantic_cache_enabled:
+            return None
+        
+        if self.settings.redis_url:
+            # Imported here: shared_cache depends on this module
+            from .shared_cache import SharedCache
+            return SharedCache(
+                self.settings.redis_url,
+                threshold=self.settings.semantic_cache_threshold,
+                ttl_seconds=self.settings.semantic_cache_ttl_seconds
             )
-        return self._openai_client
+        
+        return SemanticCache(
+            threshold=self.settings.semantic_cache_threshold,
+            max_entries=self.settings.semantic_cache_max_entries,
+            ttl_seconds=self.settings.semantic_cache_ttl_seconds
+        )
     
     @property
-    def search_client(self) -> SearchClient:
-        """Get or create Azure AI Search client."""
-        if self._search_client is None:
+    def async_search_client(self) -> AsyncSearchClient:
+        """Get or create async Azure AI Search client with a pooled aiohttp transport."""
+        if self._async_search_client is None:
             if not self.settings.azure_ai_search_endpoint:
                 raise ValueError("AZURE_AI_SEARCH_ENDPOINT environment variable not set")
             
-            self._search_client = SearchClient(
+            # aiohttp has no HTTP/2; size its pool to match the OpenAI client
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=HTTP_MAX_CONNECTIONS),
+                timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS)
+            )
+            
+            self._async_search_client = AsyncSearchClient(
                 endpoint=self.settings.azure_ai_search_endpoint,
                 index_name=self.settings.azure_search_index_name,
-                credential=self.credential
+                credential=self.async_credential,
+                transport=AioHttpTransport(session=session, session_owner=True)
             )
-        return self._search_client
+        return self._async_search_client
+    
+    async def awarm_connections(self) -> None:
+        """
+        Open connections to Azure OpenAI and Azure AI Search ahead of traffic.
+        
+        Extends ChatClient.awarm_connections with a document count against
+        the index to warm the search client's connection.
+        """
+        await super().awarm_connections()
+        
+        if self.settings.azure_ai_search_endpoint:
+            await self.async_search_client.get_document_count()
+            logger.info(f"🔌 Warmed connection to index '{self.settings.azure_search_index_name}'")
+    
+    async def aclose(self) -> None:
+        """Close async clients, including the search client, and their connection pools."""
+        if self._async_search_client is not None:
+            await self._async_search_client.close()
+            self._async_search_client = None
+        if hasattr(self.semantic_cache, "aclose"):
+            await self.semantic_cache.aclose()
+        await super().aclose()
     
     def search_documents(
         self,
         query: str,
         top_k: Optional[int] = None,
-        use_semantic_ranker: Optional[bool] = None
+        use_semantic_ranker: Optional[bool] = None,
+        include_content: bool = True,
+        query_vector: Optional[np.ndarray] = None
     ) -> list[Document]:
         """
         Search the Azure AI Search index for relevant documents.
@@ -155,6 +740,10 @@ class RAGService:
             query: User's search query
             top_k: Number of results to return (defaults to settings)
             use_semantic_ranker: Whether to use semantic ranking (defaults to settings)
+            include_content: Whether to return document content; citation-only
+                callers can skip the largest field
+            query_vector: Query embedding already computed by the caller; used
+                for the vector query instead of the index's integrated vectorizer
             
         Returns:
             List of relevant documents with content and metadata
@@ -166,86 +755,233 @@ class RAGService:
         logger.info(f"   Index: {self.settings.azure_search_index_name}, Top K: {top_k}, Semantic Ranker: {use_semantic_ranker}")
         
         # Start tracing span for document search
-        tracer = get_tracer()
-        span_context = tracer.start_as_current_span("search_documents") if tracer else None
+        with maybe_span("search_documents") as span:
+            try:
+                search_params = self._build_search_params(
+                    query, top_k, use_semantic_ranker, include_content, query_vector, span
+                )
+                
+                if use_semantic_ranker:
+                    results = self.search_client.search(**search_params)
+                else:
+                    results = self._search_fused(search_params, top_k)
+                
+                # Build Documents inline; a helper call per result costs more than the lookups
+                documents = [
+                    Document(
+                        content=r.get("content", ""),
+                        title=r.get("title", ""),
+                        source=r.get("source", ""),
+                        page_number=r.get("page_number", 0),
+                        score=r.get("@search.score", 0.0),
+                        reranker_score=r.get("@search.reranker_score", 0.0),
+                    )
+                    for r in results
+                ]
+                
+                self._record_search_results(documents, span)
+                
+                return documents
+                
+            except Exception as e:
+                logger.error(f"❌ Search failed: {str(e)}")
+                record_exception(e)
+                raise
+    
+    async def asearch_documents(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        use_semantic_ranker: Optional[bool] = None,
+        include_content: bool = True,
+        query_vector: Optional[np.ndarray] = None
+    ) -> list[Document]:
+        """
+        Async version of search_documents using the async Azure AI Search client.
+        
+        Args:
+            query: User's search query
+            top_k: Number of results to return (defaults to settings)
+            use_semantic_ranker: Whether to use semantic ranking (defaults to settings)
+            include_content: Whether to return document content; citation-only
+                callers can skip the largest field
+            query_vector: Query embedding already computed by the caller; used
+                for the vector query instead of the index's integrated vectorizer
+            
+        Returns:
+            List of relevant documents with content and metadata
+        """
+        top_k = top_k or self.settings.search_top_k
+        use_semantic_ranker = use_semantic_ranker if use_semantic_ranker is not None else self.settings.use_semantic_ranker
+        
+        logger.info(f"🔍 RAG STEP 1: Searching for query: '{query}'")
+        logger.info(f"   Index: {self.settings.azure_search_index_name}, Top K: {top_k}, Semantic Ranker: {use_semantic_ranker}")
+        
+        # Start tracing span for document search
+        with maybe_span("search_documents") as span:
+            try:
+                search_params = self._build_search_params(
+                    query, top_k, use_semantic_ranker, include_content, query_vector, span
+                )
+                
+                if use_semantic_ranker:
+                    results = [r async for r in await self.async_search_client.search(**search_params)]
+                else:
+                    results = await self._asearch_fused(search_params, top_k)
+                
+                # Build Documents inline; a helper call per result costs more than the lookups
+                documents = [
+                    Document(
+                        content=r.get("content", ""),
+                        title=r.get("title", ""),
+                        source=r.get("source", ""),
+                        page_number=r.get("page_number", 0),
+                        score=r.get("@search.score", 0.0),
+                        reranker_score=r.get("@search.reranker_score", 0.0),
+                    )
+                    for r in results
+                ]
+                
+                self._record_search_results(documents, span)
+                
+                return documents
+                
+            except Exception as e:
+                logger.error(f"❌ Search failed: {str(e)}")
+                record_exception(e)
+                raise
+    
+    @staticmethod
+    def _fusion_search_params(search_params: dict, top_k: int) -> tuple[dict, dict]:
+        """
+        Split hybrid search parameters into text-only and vector-only queries.
+        
+        Each query fetches extra candidates and selects the document key so
+        the two rankings can be fused locally with rrf_fuse.
+        
+        Returns:
+            Tuple of (text_params, vector_params)
+        """
+        candidates = top_k * RRF_CANDIDATE_MULTIPLIER
+        select = [*search_params["select"], "id"]
+        
+        text_params = {key: value for key, value in search_params.items() if key != "vector_queries"}
+        text_params.update(top=candidates, select=select)
+        
+        vector_query = search_params["vector_queries"][0]
+        vector_query.k_nearest_neighbors = candidates
+        vector_params = {"search_text": None, "vector_queries": [vector_query], "top": candidates, "select": select}
+        
+        return text_params, vector_params
+    
+    def _search_fused(self, search_params: dict, top_k: int) -> list[dict]:
+        """Run the text and vector queries in parallel and fuse their rankings."""
+        text_params, vector_params = self._fusion_search_params(search_params, top_k)
+        text_future = _search_executor.submit(lambda: list(self.search_client.search(**text_params)))
+        vector_results = list(self.search_client.search(**vector_params))
+        return rrf_fuse(text_future.result(), vector_results, top=top_k)
+    
+    async def _asearch_fused(self, search_params: dict, top_k: int) -> list[dict]:
+        """Async version of _search_fused."""
+        text_params, vector_params = self._fusion_search_params(search_params, top_k)
+        
+        async def run(params: dict) -> list[dict]:
+            return [r async for r in await self.async_search_client.search(**params)]
+        
+        text_results, vector_results = await asyncio.gather(run(text_params), run(vector_params))
+        return rrf_fuse(text_results, vector_results, top=top_k)
+    
+    def _build_search_params(
+        self,
+        query: str,
+        top_k: int,
+        use_semantic_ranker: bool,
+        include_content: bool,
+        query_vector: Optional[np.ndarray],
+        span: Any
+    ) -> dict:
+        """
+        Build hybrid search parameters and record them on the current span.
         
-        try:
-            if span_context:
-                span_context.__enter__()
+        Args:
+            query: User's search query
+            top_k: Number of results to return
+            use_semantic_ranker: Whether to use semantic ranking
+            include_content: Whether to select the content field
+            query_vector: Precomputed query embedding, or None to vectorize in the index
+            span: Recording span from maybe_span, or None to skip attributes
             
+        Returns:
+            Keyword arguments for SearchClient.search
+        """
+        if span is not None:
             # Add search parameters as span attributes
-            add_span_attribute("search.query", query)
-            add_span_attribute("search.top_k", top_k)
-            add_span_attribute("search.use_semantic_ranker", use_semantic_ranker)
-            add_span_attribute("search.index_name", self.settings.azure_search_index_name)
-            add_span_attribute("search.type", "hybrid")
-            
+            set_span_attributes({
+                "search.query": query,
+                "search.top_k": top_k,
+                "search.use_semantic_ranker": use_semantic_ranker,
+                "search.index_name": self.settings.azure_search_index_name,
+                "search.type": "hybrid" if use_semantic_ranker else "hybrid_local_rrf",
+                "search.query_vector_provided": query_vector is not None,
+            })
+            add_span_event("search_started", {"index": self.settings.azure_search_index_name})
+        
+        if query_vector is not None and self.settings.search_reuse_query_embedding:
+            # Reuse the embedding computed for the semantic cache
+            vector_query = VectorizedQuery(
+                vector=query_vector.tolist(),
+                k_nearest_neighbors=top_k,
+                fields=self.settings.vector_field_name,
+            )
+        else:
             # Use vectorizable text query - the index has an integrated vectorizer
             vector_query = VectorizableTextQuery(
                 text=query,
                 k_nearest_neighbors=top_k,
                 fields=self.settings.vector_field_name,
             )
-            
-            # Build search parameters based on azure-search-openai-demo pattern
-            search_params = {
-                "search_text": query,  # Keyword search
-                "vector_queries": [vector_query],  # Vector search
-                "top": top_k,
-                "select": ["content", "title", "source", "page_number"],
-            }
-            
-            # Add semantic ranking if enabled
-            if use_semantic_ranker:
-                search_params["query_type"] = QueryType.SEMANTIC
-                search_params["semantic_configuration_name"] = self.settings.semantic_configuration_name
-            
-            add_span_event("search_started", {"index": self.settings.azure_search_index_name})
-            
-            results = self.search_client.search(**search_params)
-            
-            documents = []
-            for result in results:
-                documents.append(Document(
-                    content=result.get("content", ""),
-                    title=result.get("title", ""),
-                    source=result.get("source", ""),
-                    page_number=result.get("page_number", 0),
-                    score=result.get("@search.score", 0),
-                    reranker_score=result.get("@search.reranker_score", 0),
-                ))
-            
+        
+        # Build search parameters based on azure-search-openai-demo pattern
+        search_params = {
+            "search_text": query,  # Keyword search
+            "search_fields": ["content"],  # Score keywords against content only
+            "vector_queries": [vector_query],  # Vector search
+            "top": top_k,
+            "select": SEARCH_SELECT_FIELDS if include_content else SEARCH_CITATION_FIELDS,
+        }
+        
+        # Add semantic ranking if enabled
+        if use_semantic_ranker:
+            search_params["query_type"] = QueryType.SEMANTIC
+            search_params["semantic_configuration_name"] = self.settings.semantic_configuration_name
+        
+        return search_params
+    
+    def _record_search_results(self, documents: list[Document], span: Any) -> None:
+        """Record search result metrics on the span (when recording) and log them."""
+        if span is not None:
             # Add result metrics to span
-            add_span_attribute("search.documents_found", len(documents))
+            attributes = {"search.documents_found": len(documents)}
             if documents:
-                add_span_attribute("search.top_score", documents[0].score)
                 sources = [doc.source for doc in documents if doc.source]
-                add_span_attribute("search.sources", ", ".join(sources[:5]))
+                attributes["search.top_score"] = documents[0].score
+                attributes["search.sources"] = ", ".join(sources[:TRACED_DOCUMENT_COUNT])
                 
                 # Add actual document content to trace (truncate if very long)
-                for i, doc in enumerate(documents[:5]):  # Limit to first 5 docs
-                    content_preview = doc.content[:2000] if len(doc.content) > 2000 else doc.content
-                    add_span_attribute(f"search.doc_{i+1}.source", doc.source or "unknown")
-                    add_span_attribute(f"search.doc_{i+1}.title", doc.title or "untitled")
-                    add_span_attribute(f"search.doc_{i+1}.page", doc.page_number)
-                    add_span_attribute(f"search.doc_{i+1}.score", doc.score)
-                    add_span_attribute(f"search.doc_{i+1}.content", content_preview)
+                for doc, keys in zip(documents, _DOC_ATTR_KEYS):
+                    source_key, title_key, page_key, score_key, content_key = keys
+                    attributes[source_key] = doc.source or "unknown"
+                    attributes[title_key] = doc.title or "untitled"
+                    attributes[page_key] = doc.page_number
+                    attributes[score_key] = doc.score
+                    attributes[content_key] = doc.content[:2000]
+            set_span_attributes(attributes)
             
             add_span_event("search_completed", {"documents_found": len(documents)})
-            
-            logger.info(f"✅ RAG STEP 1 COMPLETE: Retrieved {len(documents)} documents")
-            for i, doc in enumerate(documents):
-                logger.info(f"   [{i+1}] {doc.source} - Score: {doc.score:.4f}")
-            
-            return documents
-            
-        except Exception as e:
-            logger.error(f"❌ Search failed: {str(e)}")
-            record_exception(e)
-            raise
-        finally:
-            if span_context:
-                span_context.__exit__(None, None, None)
+        
+        logger.info(f"✅ RAG STEP 1 COMPLETE: Retrieved {len(documents)} documents")
+        for i, doc in enumerate(documents):
+            logger.info(f"   [{i+1}] {doc.source} - Score: {doc.score:.4f}")
     
     def format_sources_for_prompt(self, documents: list[Document]) -> str:
         """
@@ -253,53 +989,78 @@ class RAGService:
         
         Based on azure-search-openai-demo format: "sourcename: content"
         
+        Documents are ordered by content hash rather than relevance so that
+        queries retrieving the same documents produce an identical prompt
+        prefix, which maximizes KV/prefix cache reuse on the model server.
+        
         Args:
             documents: List of retrieved documents
             
         Returns:
             Formatted sources string for injection into system prompt
         """
-        logger.info(f"📝 RAG STEP 2: Formatting {len(documents)} documents for prompt")
+        return self._format_sources(documents, max_tokens=None)[1]
+    
+    def _format_sources(
+        self,
+        documents: list[Document],
+        max_tokens: Optional[int]
+    ) -> tuple[list[Document], str, str]:
+        """
+        Trim documents to the token budget, format them and key the prefix in one pass.
         
-        # Start tracing span for formatting
-        tracer = get_tracer()
-        span_context = tracer.start_as_current_span("format_sources") if tracer else None
+        Each document's prompt entry and content hash are built once and reused
+        for the budget check, the hash ordering of the sources and the prefix
+        cache key, instead of walking the content strings once per step.
         
-        try:
-            if span_context:
-                span_context.__enter__()
+        Args:
+            documents: Retrieved documents, most relevant first
+            max_tokens: Source token budget; documents are kept in retrieval
+                order until the next one would exceed it (None for no limit)
             
-            add_span_attribute("format.document_count", len(documents))
+        Returns:
+            Tuple of (documents that fit the budget, sources_text, prefix_cache_key)
+        """
+        logger.info(f"📝 RAG STEP 2: Formatting {len(documents)} documents for prompt")
+        
+        # Start tracing span for formatting
+        with maybe_span("format_sources") as span:
+            if span is not None:
+                add_span_attribute("format.document_count", len(documents))
             
-            if not documents:
+            # (content hash, "sourcename#page=N: content") per kept document
+            entries = []
+            budget = max_tokens
+            for i, doc in enumerate(documents):
+                entry = f"{doc.source or 'unknown'}{f'#page={doc.page_number}' if doc.page_number else ''}: {doc.content}"
+                if budget is not None:
+                    budget -= count_tokens(entry)
+                    if budget < 0:
+                        logger.info(f"✂️  Source token budget reached: keeping {i} of {len(documents)} documents")
+                        documents = documents[:i]
+                        break
+                entries.append((document_hash(doc), entry))
+            
+            if not entries:
                 logger.warning("⚠️  No documents to format - sources will be empty")
-                add_span_attribute("format.result", "no_sources")
-                return "No sources available."
-            
-            sources = []
-            for doc in documents:
-                # Create source identifier
-                source_name = doc.source or "unknown"
-                if doc.page_number:
-                    source_name += f"#page={doc.page_number}"
-                
-                # Format: sourcename: content
-                sources.append(f"{source_name}: {doc.content}")
-            
-            formatted = "\n\n".join(sources)
-            
-            add_span_attribute("format.output_chars", len(formatted))
-            add_span_attribute("format.sources_count", len(sources))
-            # Add the actual formatted context (truncate if very long)
-            context_for_trace = formatted[:8000] if len(formatted) > 8000 else formatted
-            add_span_attribute("format.context_text", context_for_trace)
+                if span is not None:
+                    add_span_attribute("format.result", "no_sources")
+                return documents, "No sources available.", _prefix_key_from_hashes([])
+            
+            entries.sort()
+            formatted = "\n\n".join(entry for _, entry in entries)
+            
+            if span is not None:
+                set_span_attributes({
+                    "format.output_chars": len(formatted),
+                    "format.sources_count": len(documents),
+                    # Add the actual formatted context (truncate if very long)
+                    "format.context_text": formatted[:8000],
+                })
             
             logger.info(f"✅ RAG STEP 2 COMPLETE: Formatted sources ({len(formatted)} chars)")
             
-            return formatted
-        finally:
-            if span_context:
-                span_context.__exit__(None, None, None)
+            return documents, formatted, _prefix_key_from_hashes([h for h, _ in entries])
     
     def format_citations_for_display(self, documents: list[Document]) -> str:
         """
@@ -311,21 +1072,7 @@ class RAGService:
         Returns:
             Formatted citations string for UI display
         """
-        if not documents:
-            return "No documents retrieved."
-        
-        citations = []
-        for i, doc in enumerate(documents, 1):
-            source_info = f"**{i}. {doc.title or 'Untitled'}**"
-            if doc.source:
-                source_info += f"\n   📄 {doc.source}"
-            if doc.page_number:
-                source_info += f" (Page {doc.page_number})"
-            if doc.reranker_score:
-                source_info += f"\n   🎯 Relevance: {doc.reranker_score:.2f}"
-            citations.append(source_info)
-        
-        return "\n\n".join(citations)
+        return format_citations(documents)
     
     def build_messages(
         self,
@@ -348,9 +1095,9 @@ class RAGService:
         """
         # Build system prompt with retrieved sources
         if system_prompt is None:
-            system_prompt = RAG_SYSTEM_PROMPT
-        
-        system_message = system_prompt.format(sources=sources)
+            system_message = "".join((RAG_SYSTEM_PROMPT_HEAD, sources, RAG_SYSTEM_PROMPT_TAIL))
+        else:
+            system_message = system_prompt.format(sources=sources)
         
         logger.info("📋 RAG STEP 3: Building conversation messages")
         
@@ -369,99 +1116,254 @@ class RAGService:
         
         return messages
     
-    def generate_response(
+    def _uses_semantic_cache(
         self,
-        messages: list[dict],
-        stream: bool = False,
-        max_tokens: Optional[int] = None,
-        temperature: Optional[float] = None
-    ) -> Any:
+        conversation_history: Optional[list[dict]],
+        documents: Optional[list[Document]] = None,
+        top_k: Optional[int] = None,
+        use_semantic_ranker: Optional[bool] = None,
+        seed: Optional[int] = None,
+        use_cache: bool = True
+    ) -> bool:
         """
-        Generate a response from Azure OpenAI.
+        Only single-turn queries that run their own retrieval with the
+        configured parameters are cached.
+        
+        Entries are keyed on the query embedding alone, so a request with its
+        own top_k, ranker setting or seed would otherwise be answered with a
+        response generated for different parameters. Callers that need a
+        fresh answer (e.g. evaluation runs) opt out with use_cache=False.
+        """
+        return (
+            use_cache
+            and self.semantic_cache is not None
+            and not conversation_history
+            and documents is None
+            and (top_k or self.settings.search_top_k) == self.settings.search_top_k
+            and use_semantic_ranker in (None, self.settings.use_semantic_ranker)
+            and seed is None
+        )
+    
+    def _cache_embedding(self, query: str) -> Optional[np.ndarray]:
+        """
+        Embed a query for the semantic cache.
+        
+        Embeddings are reused from the shared cache when one is configured.
+        Failures are logged and return None, which skips the cache.
+        """
+        cache = self.semantic_cache
+        try:
+            embedding = cache.get_embedding(query) if hasattr(cache, "get_embedding") else None
+            if embedding is None:
+                embedding = self.embed_query(query)
+                if hasattr(cache, "put_embedding"):
+                    cache.put_embedding(query, embedding)
+            return embedding
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup skipped: {e}")
+            return None
+    
+    async def _acache_embedding(self, query: str) -> Optional[np.ndarray]:
+        """Async version of _cache_embedding."""
+        cache = self.semantic_cache
+        try:
+            embedding = await cache.aget_embedding(query) if hasattr(cache, "aget_embedding") else None
+            if embedding is None:
+                embedding = await self.aembed_query(query)
+                if hasattr(cache, "aput_embedding"):
+                    await cache.aput_embedding(query, embedding)
+            return embedding
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup skipped: {e}")
+            return None
+    
+    def _cache_lookup(self, query: str) -> tuple[Optional[np.ndarray], Optional[RAGResponse]]:
+        """
+        Embed a query and look it up in the semantic cache.
+        
+        Cache failures are logged and treated as a miss.
         
-        Args:
-            messages: List of message dicts for the API
-            stream: Whether to stream the response
-            max_tokens: Maximum tokens in response (defaults to settings)
-            temperature: Sampling temperature (defaults to settings)
-            
         Returns:
-            OpenAI response object (streaming or complete)
+            Tuple of (query_embedding, cached_response); either may be None
         """
-        deployment = self.settings.azure_openai_chat_deployment
-        max_tokens = max_tokens or self.settings.max_tokens
-        temperature = temperature if temperature is not None else self.settings.temperature
+        embedding = self._cache_embedding(query)
+        if embedding is None:
+            return None, None
+        try:
+            cached = self.semantic_cache.get(embedding)
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup skipped: {e}")
+            return embedding, None
         
-        logger.info(f"🤖 RAG STEP 4: Calling OpenAI model: {deployment}")
-        logger.info(f"   Message count: {len(messages)}, Stream: {stream}")
+        add_span_attribute("rag.semantic_cache_hit", cached is not None)
+        return embedding, cached
+    
+    async def _acache_get(self, embedding: np.ndarray) -> Optional[RAGResponse]:
+        """Look up an embedded query in the semantic cache; failures are logged as a miss."""
+        try:
+            cached = await self.semantic_cache.aget(embedding)
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup skipped: {e}")
+            return None
         
-        # Start tracing span for LLM generation
-        tracer = get_tracer()
-        span_context = tracer.start_as_current_span("generate_response") if tracer else None
+        add_span_attribute("rag.semantic_cache_hit", cached is not None)
+        return cached
+    
+    async def _alookup_and_search(
+        self,
+        query: str,
+        top_k: Optional[int],
+        use_semantic_ranker: Optional[bool]
+    ) -> tuple[Optional[np.ndarray], Optional[RAGResponse], Optional[list[Document]]]:
+        """
+        Embed the query once, then run the semantic cache lookup and document
+        search concurrently.
+        
+        The embedding feeds both the cache lookup and the vector query, so the
+        index does not embed the query a second time. The search is cancelled
+        if the cache answers.
+        
+        Returns:
+            Tuple of (query_embedding, cached_response, documents); documents
+            is None on a cache hit
+        """
+        query_embedding = await self._acache_embedding(query)
         
+        add_span_event("step_1_search_started")
+        search_task = asyncio.create_task(
+            self.asearch_documents(query, top_k, use_semantic_ranker, query_vector=query_embedding)
+        )
         try:
-            if span_context:
-                span_context.__enter__()
-            
-            # Add generation parameters as span attributes
-            add_span_attribute("gen_ai.system", "azure_openai")
-            add_span_attribute("gen_ai.request.model", deployment)
-            add_span_attribute("gen_ai.request.max_tokens", max_tokens)
-            add_span_attribute("gen_ai.request.temperature", temperature)
-            add_span_attribute("gen_ai.request.streaming", stream)
-            add_span_attribute("gen_ai.request.message_count", len(messages))
-            
-            # Calculate approximate input size
-            input_chars = sum(len(m.get("content", "")) for m in messages)
-            add_span_attribute("gen_ai.request.input_chars", input_chars)
-            
-            # Add actual message content to trace
-            for i, msg in enumerate(messages):
-                role = msg.get("role", "unknown")
-                content = msg.get("content", "")
-                # Truncate very long messages (system prompt can be large)
-                content_preview = content[:10000] if len(content) > 10000 else content
-                add_span_attribute(f"gen_ai.request.message_{i}.role", role)
-                add_span_attribute(f"gen_ai.request.message_{i}.content", content_preview)
-            
-            add_span_event("llm_call_started", {"model": deployment, "stream": stream})
-            
-            response = self.openai_client.chat.completions.create(
-                model=deployment,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                stream=stream
-            )
-            
-            if not stream and hasattr(response, 'usage'):
-                add_span_attribute("gen_ai.response.prompt_tokens", response.usage.prompt_tokens)
-                add_span_attribute("gen_ai.response.completion_tokens", response.usage.completion_tokens)
-                add_span_attribute("gen_ai.response.total_tokens", response.usage.total_tokens)
-            
-            # Add actual response content for non-streaming
-            if not stream and response.choices:
-                response_content = response.choices[0].message.content or ""
-                add_span_attribute("gen_ai.response.content", response_content)
-                add_span_attribute("gen_ai.response.finish_reason", response.choices[0].finish_reason)
-            
-            add_span_event("llm_call_completed")
+            cached = await self._acache_get(query_embedding) if query_embedding is not None else None
+        except BaseException:
+            search_task.cancel()
+            raise
+        
+        if cached is not None:
+            search_task.cancel()
+            add_span_event("step_1_search_cancelled")
+            return query_embedding, cached, None
+        
+        documents = await search_task
+        add_span_event("step_1_search_completed", {"documents_found": len(documents)})
+        return query_embedding, None, documents
+    
+    def _cache_store(self, embedding: Optional[np.ndarray], response: RAGResponse) -> None:
+        """Store a response in the semantic cache; failures are logged, not raised."""
+        if embedding is None:
+            return
+        try:
+            self.semantic_cache.put(embedding, response)
+        except Exception as e:
+            logger.warning(f"Semantic cache store skipped: {e}")
+    
+    async def _acache_store(self, embedding: Optional[np.ndarray], response: RAGResponse) -> None:
+        """Async version of _cache_store."""
+        if embedding is None:
+            return
+        try:
+            await self.semantic_cache.aput(embedding, response)
+        except Exception as e:
+            logger.warning(f"Semantic cache store skipped: {e}")
+    
+    def _replay_chunks(self, answer: str) -> Generator[str, None, None]:
+        """Split a cached answer into stream-sized pieces."""
+        size = self.CACHED_STREAM_CHUNK_SIZE
+        for start in range(0, len(answer), size):
+            yield answer[start:start + size]
+    
+    def _start_workflow(
+        self,
+        query: str,
+        conversation_history: Optional[list[dict]],
+        streaming: bool,
+        span: Any
+    ) -> None:
+        """Log the incoming query and record workflow attributes on the span when recording."""
+        logger.info("=" * 50)
+        logger.info(f"📨 NEW USER QUERY{' (streaming)' if streaming else ''}: {query}")
+        logger.info("=" * 50)
+        
+        if span is None:
+            return
+        
+        # Add workflow attributes
+        set_span_attributes({
+            "rag.query": query,
+            "rag.workflow_type": "streaming" if streaming else "complete",
+            "rag.streaming": streaming,
+            "rag.conversation_turns": len(conversation_history) if conversation_history else 0,
+        })
+        
+        add_span_event(
+            "rag_stream_workflow_started" if streaming else "rag_workflow_started",
+            {"query_length": len(query)}
+        )
+    
+    def _build_prompt(
+        self,
+        query: str,
+        documents: list[Document],
+        conversation_history: Optional[list[dict]]
+    ) -> tuple[list[Document], str, str, list[dict], str]:
+        """
+        Format retrieved documents and build the messages for generation.
+        
+        Args:
+            query: User's question
+            documents: Retrieved documents
+            conversation_history: Previous messages for multi-turn
             
-            return response
+        Returns:
+            Tuple of (documents, sources_text, system_prompt, messages,
+            prefix_cache_key), where documents are those that fit the source
+            token budget
             
-        except Exception as e:
-            record_exception(e)
-            raise
-        finally:
-            if span_context:
-                span_context.__exit__(None, None, None)
+        The system prompt with sources comes first and the user query last,
+        keeping the shared prefix in a fixed position across requests.
+        """
+        # Step 2: Format sources
+        add_span_event("step_2_format_started")
+        documents, sources_text, prefix_key = self._format_sources(
+            documents, self.settings.max_source_tokens
+        )
+        add_span_event("step_2_format_completed", {"sources_length": len(sources_text)})
+        
+        # Step 3: Build messages
+        add_span_event("step_3_build_messages_started")
+        messages = self.build_messages(query, sources_text, conversation_history)
+        system_prompt = messages[0]["content"]
+        add_span_event("step_3_build_messages_completed", {"message_count": len(messages)})
+        
+        return documents, sources_text, system_prompt, messages, prefix_key
+    
+    @staticmethod
+    def _record_workflow_result(
+        query: str,
+        documents: list[Document],
+        sources_text: str,
+        answer: str
+    ) -> None:
+        """Record final workflow metrics and input/output text on the current span."""
+        set_span_attributes({
+            # Final workflow metrics
+            "rag.documents_retrieved": len(documents),
+            "rag.answer_length": len(answer),
+            "rag.status": "success",
+            # Actual input and output text
+            "rag.input.user_query": query,
+            "rag.input.context": sources_text[:8000],
+            "rag.output.answer": answer,
+        })
     
     def chat(
         self,
         query: str,
         conversation_history: Optional[list[dict]] = None,
         top_k: Optional[int] = None,
-        use_semantic_ranker: Optional[bool] = None
+        use_semantic_ranker: Optional[bool] = None,
+        seed: Optional[int] = None,
+        use_cache: bool = True
     ) -> RAGResponse:
         """
         Complete RAG chat flow: retrieve documents and generate response.
@@ -473,88 +1375,156 @@ class RAGService:
             conversation_history: Previous messages for multi-turn
             top_k: Number of documents to retrieve
             use_semantic_ranker: Whether to use semantic ranking
+            seed: Optional sampling seed for reproducible responses
+            use_cache: Whether the answer may come from or go to the semantic cache
             
         Returns:
             RAGResponse with answer, documents, and metadata
         """
-        logger.info("=" * 50)
-        logger.info(f"📨 NEW USER QUERY: {query}")
-        logger.info("=" * 50)
-        
         # Start parent tracing span for the entire RAG workflow
-        tracer = get_tracer()
-        span_context = tracer.start_as_current_span("rag_chat_workflow") if tracer else None
+        with maybe_span("rag_chat_workflow") as span:
+            try:
+                self._start_workflow(query, conversation_history, streaming=False, span=span)
+                
+                # Step 0: Answer from the semantic cache when a similar query was seen
+                query_embedding = None
+                if self._uses_semantic_cache(
+                    conversation_history, top_k=top_k, use_semantic_ranker=use_semantic_ranker,
+                    seed=seed, use_cache=use_cache
+                ):
+                    query_embedding, cached = self._cache_lookup(query)
+                    if cached is not None:
+                        add_span_event("rag_workflow_completed", {"semantic_cache_hit": True})
+                        return cached
+                
+                # Step 1: Retrieve documents
+                add_span_event("step_1_search_started")
+                documents = self.search_documents(
+                    query, top_k, use_semantic_ranker, query_vector=query_embedding
+                )
+                add_span_event("step_1_search_completed", {"documents_found": len(documents)})
+                
+                # Steps 2-3: Format sources and build messages
+                documents, sources_text, system_prompt, messages, prefix_key = self._build_prompt(
+                    query, documents, conversation_history
+                )
+                
+                # Step 4: Generate response
+                add_span_event("step_4_generate_started")
+                response = self.generate_response(messages, stream=False, seed=seed)
+                answer = response.choices[0].message.content
+                add_span_event("step_4_generate_completed", {"answer_length": len(answer)})
+                
+                if span is not None:
+                    self._record_workflow_result(query, documents, sources_text, answer)
+                
+                if hasattr(response, 'usage'):
+                    add_span_attribute("rag.total_tokens", response.usage.total_tokens)
+                
+                add_span_event("rag_workflow_completed")
+                
+                rag_response = RAGResponse(
+                    answer=answer,
+                    documents=documents,
+                    sources_text=sources_text,
+                    system_prompt=system_prompt,
+                    prefix_cache_key=prefix_key
+                )
+                self._cache_store(query_embedding, rag_response)
+                return rag_response
+                
+            except Exception as e:
+                add_span_attribute("rag.status", "error")
+                record_exception(e)
+                raise
+    
+    async def achat(
+        self,
+        query: str,
+        conversation_history: Optional[list[dict]] = None,
+        top_k: Optional[int] = None,
+        use_semantic_ranker: Optional[bool] = None,
+        seed: Optional[int] = None,
+        use_cache: bool = True
+    ) -> RAGResponse:
+        """
+        Async version of chat for use from the FastAPI event loop.
         
-        try:
-            if span_context:
-                span_context.__enter__()
-            
-            # Add workflow attributes
-            add_span_attribute("rag.query", query)
-            add_span_attribute("rag.workflow_type", "complete")
-            add_span_attribute("rag.streaming", False)
-            add_span_attribute("rag.conversation_turns", len(conversation_history) if conversation_history else 0)
-            
-            add_span_event("rag_workflow_started", {"query_length": len(query)})
-            
-            # Step 1: Retrieve documents
-            add_span_event("step_1_search_started")
-            documents = self.search_documents(query, top_k, use_semantic_ranker)
-            add_span_event("step_1_search_completed", {"documents_found": len(documents)})
-            
-            # Step 2: Format sources
-            add_span_event("step_2_format_started")
-            sources_text = self.format_sources_for_prompt(documents)
-            add_span_event("step_2_format_completed", {"sources_length": len(sources_text)})
-            
-            # Step 3: Build messages
-            add_span_event("step_3_build_messages_started")
-            system_prompt = RAG_SYSTEM_PROMPT.format(sources=sources_text)
-            messages = self.build_messages(query, sources_text, conversation_history)
-            add_span_event("step_3_build_messages_completed", {"message_count": len(messages)})
-            
-            # Step 4: Generate response
-            add_span_event("step_4_generate_started")
-            response = self.generate_response(messages, stream=False)
-            answer = response.choices[0].message.content
-            add_span_event("step_4_generate_completed", {"answer_length": len(answer)})
-            
-            # Add final workflow metrics
-            add_span_attribute("rag.documents_retrieved", len(documents))
-            add_span_attribute("rag.answer_length", len(answer))
-            add_span_attribute("rag.status", "success")
-            
-            # Add actual input and output text to workflow span
-            add_span_attribute("rag.input.user_query", query)
-            add_span_attribute("rag.input.context", sources_text[:8000] if len(sources_text) > 8000 else sources_text)
-            add_span_attribute("rag.output.answer", answer)
-            
-            if hasattr(response, 'usage'):
-                add_span_attribute("rag.total_tokens", response.usage.total_tokens)
-            
-            add_span_event("rag_workflow_completed")
-            
-            return RAGResponse(
-                answer=answer,
-                documents=documents,
-                sources_text=sources_text,
-                system_prompt=system_prompt
-            )
+        Args:
+            query: User's question
+            conversation_history: Previous messages for multi-turn
+            top_k: Number of documents to retrieve
+            use_semantic_ranker: Whether to use semantic ranking
+            seed: Optional sampling seed for reproducible responses
+            use_cache: Whether the answer may come from or go to the semantic cache
             
-        except Exception as e:
-            add_span_attribute("rag.status", "error")
-            record_exception(e)
-            raise
-        finally:
-            if span_context:
-                span_context.__exit__(None, None, None)
+        Returns:
+            RAGResponse with answer, documents, and metadata
+        """
+        # Start parent tracing span for the entire RAG workflow
+        with maybe_span("rag_chat_workflow") as span:
+            try:
+                self._start_workflow(query, conversation_history, streaming=False, span=span)
+                
+                # Steps 0-1: Check the semantic cache while retrieving documents
+                query_embedding = None
+                if self._uses_semantic_cache(
+                    conversation_history, top_k=top_k, use_semantic_ranker=use_semantic_ranker,
+                    seed=seed, use_cache=use_cache
+                ):
+                    query_embedding, cached, documents = await self._alookup_and_search(
+                        query, top_k, use_semantic_ranker
+                    )
+                    if cached is not None:
+                        add_span_event("rag_workflow_completed", {"semantic_cache_hit": True})
+                        return cached
+                else:
+                    add_span_event("step_1_search_started")
+                    documents = await self.asearch_documents(query, top_k, use_semantic_ranker)
+                    add_span_event("step_1_search_completed", {"documents_found": len(documents)})
+                
+                # Steps 2-3: Format sources and build messages
+                documents, sources_text, system_prompt, messages, prefix_key = self._build_prompt(
+                    query, documents, conversation_history
+                )
+                
+                # Step 4: Generate response
+                add_span_event("step_4_generate_started")
+                response = await self.agenerate_response(messages, stream=False, seed=seed)
+                answer = response.choices[0].message.content
+                add_span_event("step_4_generate_completed", {"answer_length": len(answer)})
+                
+                if span is not None:
+                    self._record_workflow_result(query, documents, sources_text, answer)
+                
+                if hasattr(response, 'usage'):
+                    add_span_attribute("rag.total_tokens", response.usage.total_tokens)
+                
+                add_span_event("rag_workflow_completed")
+                
+                rag_response = RAGResponse(
+                    answer=answer,
+                    documents=documents,
+                    sources_text=sources_text,
+                    system_prompt=system_prompt,
+                    prefix_cache_key=prefix_key
+                )
+                await self._acache_store(query_embedding, rag_response)
+                return rag_response
+                
+            except Exception as e:
+                add_span_attribute("rag.status", "error")
+                record_exception(e)
+                raise
     
     def chat_stream(
         self,
         query: str,
         conversation_history: Optional[list[dict]] = None,
         top_k: Optional[int] = None,
-        use_semantic_ranker: Optional[bool] = None
+        use_semantic_ranker: Optional[bool] = None,
+        documents: Optional[list[Document]] = None,
+        use_cache: bool = True
     ) -> Generator[tuple[str, Optional[RAGResponse]], None, None]:
         """
         Streaming RAG chat flow: retrieve documents and stream response.
@@ -567,100 +1537,194 @@ class RAGService:
             conversation_history: Previous messages for multi-turn
             top_k: Number of documents to retrieve
             use_semantic_ranker: Whether to use semantic ranking
+            documents: Already retrieved documents; skips the search step when provided
+            use_cache: Whether the answer may come from or go to the semantic cache
             
         Yields:
             Tuples of (chunk_text, optional_final_response)
             The final_response is only populated on the last yield
         """
-        logger.info("=" * 50)
-        logger.info(f"📨 NEW USER QUERY (streaming): {query}")
-        logger.info("=" * 50)
-        
         # Start parent tracing span for the streaming RAG workflow
-        tracer = get_tracer()
-        span_context = tracer.start_as_current_span("rag_chat_stream_workflow") if tracer else None
+        with maybe_span("rag_chat_stream_workflow") as span:
+            try:
+                self._start_workflow(query, conversation_history, streaming=True, span=span)
+                
+                # Step 0: Replay a cached answer when a similar query was seen
+                query_embedding = None
+                if self._uses_semantic_cache(
+                    conversation_history, documents, top_k, use_semantic_ranker, use_cache=use_cache
+                ):
+                    query_embedding, cached = self._cache_lookup(query)
+                    if cached is not None:
+                        for piece in self._replay_chunks(cached.answer):
+                            yield piece, None
+                        add_span_event("rag_stream_workflow_completed", {"semantic_cache_hit": True})
+                        yield "", cached
+                        return
+                
+                # Step 1: Retrieve documents unless the caller already has them
+                if documents is None:
+                    add_span_event("step_1_search_started")
+                    documents = self.search_documents(
+                        query, top_k, use_semantic_ranker, query_vector=query_embedding
+                    )
+                    add_span_event("step_1_search_completed", {"documents_found": len(documents)})
+                else:
+                    add_span_event("step_1_search_skipped", {"documents_provided": len(documents)})
+                
+                # Steps 2-3: Format sources and build messages
+                documents, sources_text, system_prompt, messages, prefix_key = self._build_prompt(
+                    query, documents, conversation_history
+                )
+                
+                # Step 4: Stream response
+                add_span_event("step_4_stream_started")
+                response = self.generate_response(messages, stream=True)
+                
+                # Collect deltas in a list and join once; += on the answer string
+                # copies everything streamed so far on every chunk
+                answer_parts = []
+                for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        content = chunk.choices[0].delta.content
+                        answer_parts.append(content)
+                        yield content, None
+                
+                full_answer = "".join(answer_parts)
+                chunk_count = len(answer_parts)
+                
+                add_span_event("step_4_stream_completed", {
+                    "answer_length": len(full_answer),
+                    "chunk_count": chunk_count
+                })
+                
+                if span is not None:
+                    self._record_workflow_result(query, documents, sources_text, full_answer)
+                add_span_attribute("rag.stream_chunk_count", chunk_count)
+                
+                add_span_event("rag_stream_workflow_completed")
+                
+                # Final yield with complete metadata
+                final_response = RAGResponse(
+                    answer=full_answer,
+                    documents=documents,
+                    sources_text=sources_text,
+                    system_prompt=system_prompt,
+                    prefix_cache_key=prefix_key
+                )
+                self._cache_store(query_embedding, final_response)
+                yield "", final_response
+                
+            except Exception as e:
+                add_span_attribute("rag.status", "error")
+                record_exception(e)
+                raise
+    
+    async def achat_stream(
+        self,
+        query: str,
+        conversation_history: Optional[list[dict]] = None,
+        top_k: Optional[int] = None,
+        use_semantic_ranker: Optional[bool] = None,
+        documents: Optional[list[Document]] = None,
+        use_cache: bool = True
+    ) -> AsyncGenerator[tuple[str, Optional[RAGResponse]], None]:
+        """
+        Async version of chat_stream for use from the FastAPI event loop.
         
-        try:
-            if span_context:
-                span_context.__enter__()
-            
-            # Add workflow attributes
-            add_span_attribute("rag.query", query)
-            add_span_attribute("rag.workflow_type", "streaming")
-            add_span_attribute("rag.streaming", True)
-            add_span_attribute("rag.conversation_turns", len(conversation_history) if conversation_history else 0)
-            
-            add_span_event("rag_stream_workflow_started", {"query_length": len(query)})
-            
-            # Step 1: Retrieve documents
-            add_span_event("step_1_search_started")
-            documents = self.search_documents(query, top_k, use_semantic_ranker)
-            add_span_event("step_1_search_completed", {"documents_found": len(documents)})
-            
-            # Step 2: Format sources
-            add_span_event("step_2_format_started")
-            sources_text = self.format_sources_for_prompt(documents)
-            add_span_event("step_2_format_completed", {"sources_length": len(sources_text)})
-            
-            # Step 3: Build messages
-            add_span_event("step_3_build_messages_started")
-            system_prompt = RAG_SYSTEM_PROMPT.format(sources=sources_text)
-            messages = self.build_messages(query, sources_text, conversation_history)
-            add_span_event("step_3_build_messages_completed", {"message_count": len(messages)})
-            
-            # Step 4: Stream response
-            add_span_event("step_4_stream_started")
-            response = self.generate_response(messages, stream=True)
-            
-            full_answer = ""
-            chunk_count = 0
-            for chunk in response:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    full_answer += content
-                    chunk_count += 1
-                    yield content, None
-            
-            add_span_event("step_4_stream_completed", {
-                "answer_length": len(full_answer),
-                "chunk_count": chunk_count
-            })
-            
-            # Add final workflow metrics
-            add_span_attribute("rag.documents_retrieved", len(documents))
-            add_span_attribute("rag.answer_length", len(full_answer))
-            add_span_attribute("rag.stream_chunk_count", chunk_count)
-            add_span_attribute("rag.status", "success")
-            
-            # Add actual input and output text to workflow span
-            add_span_attribute("rag.input.user_query", query)
-            add_span_attribute("rag.input.context", sources_text[:8000] if len(sources_text) > 8000 else sources_text)
-            add_span_attribute("rag.output.answer", full_answer)
-            
-            add_span_event("rag_stream_workflow_completed")
-            
-            # Final yield with complete metadata
-            final_response = RAGResponse(
-                answer=full_answer,
-                documents=documents,
-                sources_text=sources_text,
-                system_prompt=system_prompt
-            )
-            yield "", final_response
+        Args:
+            query: User's question
+            conversation_history: Previous messages for multi-turn
+            top_k: Number of documents to retrieve
+            use_semantic_ranker: Whether to use semantic ranking
+            documents: Already retrieved documents; skips the search step when provided
+            use_cache: Whether the answer may come from or go to the semantic cache
             
-        except Exception as e:
-            add_span_attribute("rag.status", "error")
-            record_exception(e)
-            raise
-        finally:
-            if span_context:
-                span_context.__exit__(None, None, None)
+        Yields:
+            Tuples of (chunk_text, optional_final_response)
+            The final_response is only populated on the last yield
+        """
+        # Start parent tracing span for the streaming RAG workflow
+        with maybe_span("rag_chat_stream_workflow") as span:
+            try:
+                self._start_workflow(query, conversation_history, streaming=True, span=span)
+                
+                # Steps 0-1: Check the semantic cache while retrieving documents,
+                # unless the caller already has them; replay cached answers
+                query_embedding = None
+                if self._uses_semantic_cache(
+                    conversation_history, documents, top_k, use_semantic_ranker, use_cache=use_cache
+                ):
+                    query_embedding, cached, documents = await self._alookup_and_search(
+                        query, top_k, use_semantic_ranker
+                    )
+                    if cached is not None:
+                        for piece in self._replay_chunks(cached.answer):
+                            yield piece, None
+                        add_span_event("rag_stream_workflow_completed", {"semantic_cache_hit": True})
+                        yield "", cached
+                        return
+                elif documents is None:
+                    add_span_event("step_1_search_started")
+                    documents = await self.asearch_documents(query, top_k, use_semantic_ranker)
+                    add_span_event("step_1_search_completed", {"documents_found": len(documents)})
+                else:
+                    add_span_event("step_1_search_skipped", {"documents_provided": len(documents)})
+                
+                # Steps 2-3: Format sources and build messages
+                documents, sources_text, system_prompt, messages, prefix_key = self._build_prompt(
+                    query, documents, conversation_history
+                )
+                
+                # Step 4: Stream response
+                add_span_event("step_4_stream_started")
+                response = await self.agenerate_response(messages, stream=True)
+                
+                # Collect deltas in a list and join once; += on the answer string
+                # copies everything streamed so far on every chunk
+                answer_parts = []
+                async for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        content = chunk.choices[0].delta.content
+                        answer_parts.append(content)
+                        yield content, None
+                
+                full_answer = "".join(answer_parts)
+                chunk_count = len(answer_parts)
+                
+                add_span_event("step_4_stream_completed", {
+                    "answer_length": len(full_answer),
+                    "chunk_count": chunk_count
+                })
+                
+                if span is not None:
+                    self._record_workflow_result(query, documents, sources_text, full_answer)
+                add_span_attribute("rag.stream_chunk_count", chunk_count)
+                
+                add_span_event("rag_stream_workflow_completed")
+                
+                # Final yield with complete metadata
+                final_response = RAGResponse(
+                    answer=full_answer,
+                    documents=documents,
+                    sources_text=sources_text,
+                    system_prompt=system_prompt,
+                    prefix_cache_key=prefix_key
+                )
+                await self._acache_store(query_embedding, final_response)
+                yield "", final_response
+                
+            except Exception as e:
+                add_span_attribute("rag.status", "error")
+                record_exception(e)
+                raise
     
     def get_documents_for_query(
         self,
         query: str,
         top_k: Optional[int] = None,
-        use_semantic_ranker: Optional[bool] = None
+        use_semantic_ranker: Optional[bool] = None,
+        include_content: bool = True
     ) -> list[Document]:
         """
         Retrieve documents for a query without generating a response.
@@ -671,8 +1735,30 @@ class RAGService:
             query: Search query
             top_k: Number of documents to retrieve
             use_semantic_ranker: Whether to use semantic ranking
+            include_content: Whether to return document content
+            
+        Returns:
+            List of retrieved documents
+        """
+        return self.search_documents(query, top_k, use_semantic_ranker, include_content)
+    
+    async def aget_documents_for_query(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        use_semantic_ranker: Optional[bool] = None,
+        include_content: bool = True
+    ) -> list[Document]:
+        """
+        Async version of get_documents_for_query.
+        
+        Args:
+            query: Search query
+            top_k: Number of documents to retrieve
+            use_semantic_ranker: Whether to use semantic ranking
+            include_content: Whether to return document content
             
         Returns:
             List of retrieved documents
         """
-        return self.search_documents(query, top_k, use_semantic_ranker)
+        return await self.asearch_documents(query, top_k, use_semantic_ranker, include_content)
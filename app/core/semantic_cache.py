@@ -0,0 +1,286 @@
+"""
+Semantic response cache for near-duplicate queries.
+
+Exact-match caching misses paraphrases ("What is RAG?" vs "Explain RAG").
+This cache stores answers keyed by the query embedding and returns a cached
+answer when a new query is close enough in cosine similarity.
+
+Candidate lookup uses random-projection LSH: each of L tables hashes an
+embedding to the sign bits of k random hyperplanes, so only entries sharing
+at least one bucket with the query are scored.
+
+Cached vectors are normalized and quantized to int8 with a per-vector scale
+on insert, and live in one contiguous int8 matrix. Scoring is an int32 dot
+product rescaled by the two vector scales, a quarter of the memory traffic
+of float32. When numba is installed the scoring and LSH signing loops are
+JIT-compiled; otherwise NumPy is used.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def candidate_scores(
+        query: np.ndarray,
+        query_scale: float,
+        vectors: np.ndarray,
+        scales: np.ndarray,
+        rows: np.ndarray
+    ) -> np.ndarray:
+        """Cosine scores of an int8 query against selected rows of the int8 vector matrix."""
+        scores = np.empty(rows.shape[0], dtype=np.float32)
+        for i in prange(rows.shape[0]):
+            row = rows[i]
+            acc = np.int32(0)
+            for j in range(query.shape[0]):
+                acc += np.int32(vectors[row, j]) * np.int32(query[j])
+            scores[i] = acc * scales[row] * query_scale
+        return scores
+    
+    @njit(fastmath=True, cache=True)
+    def lsh_sign(query: np.ndarray, hyperplanes: np.ndarray) -> np.ndarray:
+        """Pack the hyperplane sign bits of a query into one uint64 key per table."""
+        num_tables, num_planes, dim = hyperplanes.shape
+        keys = np.zeros(num_tables, dtype=np.uint64)
+        for table in range(num_tables):
+            key = np.uint64(0)
+            for plane in range(num_planes):
+                acc = np.float32(0.0)
+                for j in range(dim):
+                    acc += hyperplanes[table, plane, j] * query[j]
+                if acc > 0:
+                    key |= np.uint64(1) << np.uint64(plane)
+            keys[table] = key
+        return keys
+else:
+    def candidate_scores(
+        query: np.ndarray,
+        query_scale: float,
+        vectors: np.ndarray,
+        scales: np.ndarray,
+        rows: np.ndarray
+    ) -> np.ndarray:
+        """Cosine scores of an int8 query against selected rows of the int8 vector matrix."""
+        dots = vectors[rows].astype(np.int32) @ query.astype(np.int32)
+        return (dots * scales[rows] * query_scale).astype(np.float32)
+    
+    def lsh_sign(query: np.ndarray, hyperplanes: np.ndarray) -> np.ndarray:
+        """Pack the hyperplane sign bits of a query into one uint64 key per table."""
+        bits = (hyperplanes @ query) > 0
+        weights = np.left_shift(np.uint64(1), np.arange(hyperplanes.shape[1], dtype=np.uint64))
+        return (bits.astype(np.uint64) * weights).sum(axis=1)
+
+
+class SemanticCache:
+    """
+    In-process semantic cache with random-projection LSH candidate lookup.
+    
+    Usage:
+        cache = SemanticCache(threshold=0.95)
+        
+        hit = cache.get(query_embedding)
+        if hit is None:
+            response = rag.chat(query)
+            cache.put(query_embedding, response)
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = None,
+        num_tables: int = 16,
+        hyperplanes_per_table: int = 8,
+        seed: int = 0
+    ):
+        """
+        Initialize the semantic cache.
+        
+        Args:
+            threshold: Minimum cosine similarity for a cache hit
+            max_entries: Maximum number of cached entries (LRU eviction)
+            ttl_seconds: Lifetime of an entry in seconds (None for no expiry)
+            num_tables: Number of LSH tables (L)
+            hyperplanes_per_table: Random hyperplanes per table (k)
+            seed: Seed for hyperplane generation
+        """
+        self._init_lsh(threshold, num_tables, hyperplanes_per_table, seed)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        
+        # The vector matrix is created lazily once the embedding dimension is known
+        self._vectors: Optional[np.ndarray] = None
+        self._scales = np.zeros(max_entries, dtype=np.float32)
+        
+        # Entry ids are row indices into the vector matrix; entries hold
+        # (value, bucket keys, expiry time)
+        self._entries: OrderedDict[int, tuple[Any, tuple[int, ...], float]] = OrderedDict()
+        self._buckets: list[dict[int, set[int]]] = [{} for _ in range(num_tables)]
+        self._free_rows = list(range(max_entries - 1, -1, -1))
+    
+    def _init_lsh(self, threshold: float, num_tables: int, hyperplanes_per_table: int, seed: int) -> None:
+        """Set the similarity threshold, LSH parameters, lock and hit/miss counters."""
+        self.threshold = threshold
+        self.num_tables = num_tables
+        self.hyperplanes_per_table = hyperplanes_per_table
+        self._seed = seed
+        
+        # Hyperplanes are created lazily once the embedding dimension is known
+        self._hyperplanes: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        """Convert an embedding to a unit-length float32 vector."""
+        vector = np.ascontiguousarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    @staticmethod
+    def _quantize(vector: np.ndarray) -> tuple[np.ndarray, float]:
+        """
+        Quantize a unit vector to int8 with a per-vector scale.
+        
+        Returns:
+            Tuple of (int8 vector, scale) where vector ≈ int8 vector * scale
+        """
+        peak = float(np.max(np.abs(vector))) if vector.size else 0.0
+        if not peak:
+            return np.zeros(vector.shape, dtype=np.int8), 1.0
+        scale = peak / 127.0
+        return np.clip(np.round(vector / scale), -127, 127).astype(np.int8), scale
+    
+    def _bucket_keys(self, vector: np.ndarray) -> tuple[int, ...]:
+        """Hash a vector to one bucket key per LSH table."""
+        if self._hyperplanes is None:
+            rng = np.random.default_rng(self._seed)
+            self._hyperplanes = rng.standard_normal(
+                (self.num_tables, self.hyperplanes_per_table, vector.shape[0])
+            ).astype(np.float32)
+        
+        return tuple(int(k) for k in lsh_sign(vector, self._hyperplanes))
+    
+    def get(self, embedding, threshold: Optional[float] = None) -> Optional[Any]:
+        """
+        Return the cached value for the most similar prior query.
+        
+        Args:
+            embedding: Query embedding
+            threshold: Minimum cosine similarity (defaults to the cache threshold)
+        
+        Returns:
+            The cached value, or None on a miss
+        """
+        threshold = self.threshold if threshold is None else threshold
+        vector = self._normalize(embedding)
+        
+        with self._lock:
+            keys = self._bucket_keys(vector)
+            candidates: set[int] = set()
+            for table, key in zip(self._buckets, keys):
+                candidates.update(table.get(key, ()))
+            
+            # Drop expired entries before scoring
+            if self.ttl_seconds is not None and candidates:
+                now = time.monotonic()
+                expired = {entry_id for entry_id in candidates if self._entries[entry_id][2] <= now}
+                for entry_id in expired:
+                    self._remove(entry_id)
+                candidates -= expired
+            
+            if not candidates:
+                self.misses += 1
+                return None
+            
+            rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            quantized, scale = self._quantize(vector)
+            scores = candidate_scores(quantized, scale, self._vectors, self._scales, rows)
+            best = int(np.argmax(scores))
+            best_id, best_score = int(rows[best]), float(scores[best])
+            
+            if best_score < threshold:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            logger.info(f"Semantic cache hit (cosine={best_score:.4f})")
+            return self._entries[best_id][0]
+    
+    def put(self, embedding, value: Any) -> None:
+        """
+        Store a value for a query embedding.
+        
+        Args:
+            embedding: Query embedding
+            value: Value to return for similar queries (e.g. a RAGResponse)
+        """
+        vector = self._normalize(embedding)
+        
+        with self._lock:
+            keys = self._bucket_keys(vector)
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.int8)
+            if not self._free_rows:
+                self._evict_oldest()
+            
+            expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else float("inf")
+            entry_id = self._free_rows.pop()
+            self._vectors[entry_id], self._scales[entry_id] = self._quantize(vector)
+            self._entries[entry_id] = (value, keys, expires_at)
+            for table, key in zip(self._buckets, keys):
+                table.setdefault(key, set()).add(entry_id)
+    
+    async def aget(self, embedding, threshold: Optional[float] = None) -> Optional[Any]:
+        """Async version of get; in-process lookups do not block on I/O."""
+        return self.get(embedding, threshold)
+    
+    async def aput(self, embedding, value: Any) -> None:
+        """Async version of put."""
+        self.put(embedding, value)
+    
+    def _evict_oldest(self) -> None:
+        """Remove the least recently used entry from the cache and its buckets."""
+        self._remove(next(iter(self._entries)))
+    
+    def _remove(self, entry_id: int) -> None:
+        """Remove an entry from the cache and its buckets, freeing its row."""
+        _, keys, _ = self._entries.pop(entry_id)
+        for table, key in zip(self._buckets, keys):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del table[key]
+        self._free_rows.append(entry_id)
+    
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "max_size": self.max_entries
+        }
+    
+    async def astats(self) -> dict:
+        """Async version of stats."""
+        return self.stats()
@@ -0,0 +1,275 @@
+"""
+Redis-backed semantic and embedding cache shared across processes.
+
+The in-process SemanticCache is private to each uvicorn worker and each
+Streamlit process, so a paraphrase answered by one worker is a miss on the
+others. SharedCache keeps the same LSH bucketing but stores entries in Redis,
+so every process on a node reads and writes one cache.
+
+Key layout (prefix defaults to "ragcache"):
+    {prefix}:entry:{id}          HASH  embedding <float32 bytes>, value <json>
+    {prefix}:bucket:{table}:{key} SET  entry ids sharing an LSH bucket
+    {prefix}:emb:{blake2b(text)}  STRING float32 embedding bytes
+    {prefix}:next_id             STRING entry id counter
+
+Entries expire after ttl_seconds; configure Redis with an LRU maxmemory-policy
+to bound memory instead of a max entry count.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import logging
+from typing import Optional
+
+import numpy as np
+import orjson
+
+from .rag import Document, RAGResponse
+from .semantic_cache import SemanticCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds astats waits for Redis before reporting the entry count as unknown
+STATS_TIMEOUT_SECONDS = 0.5
+
+
+class SharedCache(SemanticCache):
+    """
+    Semantic cache with the same interface as SemanticCache, backed by Redis.
+    
+    Usage:
+        cache = SharedCache("redis://localhost:6379/0", threshold=0.95)
+        
+        hit = await cache.aget(query_embedding)
+        if hit is None:
+            response = await rag.achat(query)
+            await cache.aput(query_embedding, response)
+    """
+    
+    def __init__(
+        self,
+        redis_url: str,
+        threshold: float = 0.95,
+        ttl_seconds: int = 86400,
+        prefix: str = "ragcache",
+        num_tables: int = 16,
+        hyperplanes_per_table: int = 8,
+        seed: int = 0
+    ):
+        """
+        Initialize the shared cache.
+        
+        Args:
+            redis_url: Redis connection URL
+            threshold: Minimum cosine similarity for a cache hit
+            ttl_seconds: Expiry applied to cached entries and embeddings
+            prefix: Key prefix for all cache keys
+            num_tables: Number of LSH tables (L)
+            hyperplanes_per_table: Random hyperplanes per table (k)
+            seed: Seed for hyperplane generation; must match across processes
+        """
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as e:
+            raise ImportError("SharedCache requires the 'redis' package: pip install redis") from e
+        
+        # Entries live in Redis, so the in-process vector matrix and LRU
+        # tables of SemanticCache are not allocated
+        self._init_lsh(threshold, num_tables, hyperplanes_per_table, seed)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(redis_url)
+        self._aredis = redis.asyncio.Redis.from_url(redis_url)
+    
+    def _entry_key(self, entry_id: int) -> str:
+        """Redis key of the hash holding one cached entry."""
+        return f"{self.prefix}:entry:{entry_id}"
+    
+    def _bucket_redis_keys(self, vector: np.ndarray) -> list[str]:
+        """Redis keys of the LSH bucket sets for a normalized vector."""
+        with self._lock:
+            keys = self._bucket_keys(vector)
+        return [f"{self.prefix}:bucket:{table}:{key}" for table, key in enumerate(keys)]
+    
+    def _embedding_key(self, text: str) -> str:
+        """Redis key of the cached embedding for a text."""
+        return f"{self.prefix}:emb:{hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()}"
+    
+    @staticmethod
+    def _encode_value(value: RAGResponse) -> bytes:
+        """Serialize a RAGResponse (including its documents) to JSON."""
+        # Only dataclass fields: orjson would also emit computed cached properties
+        return orjson.dumps({f.name: getattr(value, f.name) for f in dataclasses.fields(value)})
+    
+    @staticmethod
+    def _decode_value(data: bytes) -> RAGResponse:
+        """Rebuild a RAGResponse from its JSON form."""
+        fields = orjson.loads(data)
+        fields["documents"] = [Document(**doc) for doc in fields["documents"]]
+        return RAGResponse(**fields)
+    
+    def _best_candidate(self, vector: np.ndarray, ids: list[bytes], embeddings: list[Optional[bytes]]):
+        """Score candidate embeddings and return (entry_id, score) of the best one."""
+        best_id, best_score = None, -1.0
+        for entry_id, data in zip(ids, embeddings):
+            if data is None:
+                # Entry expired but its id is still in a bucket set
+                continue
+            score = float(np.dot(np.frombuffer(data, dtype=np.float32), vector))
+            if score > best_score:
+                best_id, best_score = int(entry_id), score
+        return best_id, best_score
+    
+    def _record_lookup(self, best_id: Optional[int], best_score: float, threshold: float) -> bool:
+        """Update hit/miss counters and return whether the lookup is a hit."""
+        if best_id is None or best_score < threshold:
+            self.misses += 1
+            return False
+        self.hits += 1
+        logger.info(f"Shared cache hit (cosine={best_score:.4f})")
+        return True
+    
+    def get(self, embedding, threshold: Optional[float] = None) -> Optional[RAGResponse]:
+        """
+        Return the cached response for the most similar prior query.
+        
+        Args:
+            embedding: Query embedding
+            threshold: Minimum cosine similarity (defaults to the cache threshold)
+        
+        Returns:
+            The cached RAGResponse, or None on a miss
+        """
+        threshold = self.threshold if threshold is None else threshold
+        vector = self._normalize(embedding)
+        
+        ids = list(self._redis.sunion(self._bucket_redis_keys(vector)))
+        if not ids:
+            self.misses += 1
+            return None
+        
+        pipe = self._redis.pipeline(transaction=False)
+        for entry_id in ids:
+            pipe.hget(self._entry_key(int(entry_id)), "embedding")
+        best_id, best_score = self._best_candidate(vector, ids, pipe.execute())
+        
+        if not self._record_lookup(best_id, best_score, threshold):
+            return None
+        data = self._redis.hget(self._entry_key(best_id), "value")
+        return self._decode_value(data) if data is not None else None
+    
+    async def aget(self, embedding, threshold: Optional[float] = None) -> Optional[RAGResponse]:
+        """Async version of get."""
+        threshold = self.threshold if threshold is None else threshold
+        vector = self._normalize(embedding)
+        
+        ids = list(await self._aredis.sunion(self._bucket_redis_keys(vector)))
+        if not ids:
+            self.misses += 1
+            return None
+        
+        pipe = self._aredis.pipeline(transaction=False)
+        for entry_id in ids:
+            pipe.hget(self._entry_key(int(entry_id)), "embedding")
+        best_id, best_score = self._best_candidate(vector, ids, await pipe.execute())
+        
+        if not self._record_lookup(best_id, best_score, threshold):
+            return None
+        data = await self._aredis.hget(self._entry_key(best_id), "value")
+        return self._decode_value(data) if data is not None else None
+    
+    def put(self, embedding, value: RAGResponse) -> None:
+        """
+        Store a response for a query embedding.
+        
+        Args:
+            embedding: Query embedding
+            value: RAGResponse to return for similar queries
+        """
+        vector = self._normalize(embedding)
+        entry_id = self._redis.incr(f"{self.prefix}:next_id")
+        
+        pipe = self._redis.pipeline(transaction=False)
+        self._queue_put(pipe, entry_id, vector, value)
+        pipe.execute()
+    
+    async def aput(self, embedding, value: RAGResponse) -> None:
+        """Async version of put."""
+        vector = self._normalize(embedding)
+        entry_id = await self._aredis.incr(f"{self.prefix}:next_id")
+        
+        pipe = self._aredis.pipeline(transaction=False)
+        self._queue_put(pipe, entry_id, vector, value)
+        await pipe.execute()
+    
+    def _queue_put(self, pipe, entry_id: int, vector: np.ndarray, value: RAGResponse) -> None:
+        """Queue the commands that store an entry and index it in its LSH buckets."""
+        entry_key = self._entry_key(entry_id)
+        pipe.hset(entry_key, mapping={
+            "embedding": vector.astype(np.float32).tobytes(),
+            "value": self._encode_value(value)
+        })
+        pipe.expire(entry_key, self.ttl_seconds)
+        for bucket_key in self._bucket_redis_keys(vector):
+            pipe.sadd(bucket_key, entry_id)
+            pipe.expire(bucket_key, self.ttl_seconds)
+    
+    def get_embedding(self, text: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for a text, or None."""
+        data = self._redis.get(self._embedding_key(text))
+        return np.frombuffer(data, dtype=np.float32) if data is not None else None
+    
+    async def aget_embedding(self, text: str) -> Optional[np.ndarray]:
+        """Async version of get_embedding."""
+        data = await self._aredis.get(self._embedding_key(text))
+        return np.frombuffer(data, dtype=np.float32) if data is not None else None
+    
+    def put_embedding(self, text: str, embedding: np.ndarray) -> None:
+        """Cache the embedding for a text."""
+        data = np.asarray(embedding, dtype=np.float32).tobytes()
+        self._redis.set(self._embedding_key(text), data, ex=self.ttl_seconds)
+    
+    async def aput_embedding(self, text: str, embedding: np.ndarray) -> None:
+        """Async version of put_embedding."""
+        data = np.asarray(embedding, dtype=np.float32).tobytes()
+        await self._aredis.set(self._embedding_key(text), data, ex=self.ttl_seconds)
+    
+    def stats(self) -> dict:
+        """Return this process's hit/miss counters and the shared entry count."""
+        try:
+            size = int(self._redis.get(f"{self.prefix}:next_id") or 0)
+        except Exception:
+            size = -1
+        return self._stats(size)
+    
+    async def astats(self) -> dict:
+        """
+        Async version of stats for the health endpoint.
+        
+        Waits at most STATS_TIMEOUT_SECONDS for Redis, so a slow or
+        unreachable server reports entries_written as -1 instead of
+        stalling the probe.
+        """
+        try:
+            size = int(await asyncio.wait_for(
+                self._aredis.get(f"{self.prefix}:next_id"), STATS_TIMEOUT_SECONDS
+            ) or 0)
+        except Exception:
+            size = -1
+        return self._stats(size)
+    
+    def _stats(self, size: int) -> dict:
+        """Build the stats dict for a shared entry count (-1 when unknown)."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "backend": "redis",
+            "entries_written": size
+        }
+    
+    async def aclose(self) -> None:
+        """Close Redis connections."""
+        self._redis.close()
+        await self._aredis.aclose()
@@ -10,20 +10,78 @@ Sets up distributed tracing with Azure Application Insights to capture:
 Environment Variables:
     APPLICATIONINSIGHTS_CONNECTION_STRING: Required for Azure App Insights export
     AZURE_TRACING_GEN_AI_CONTENT_RECORDING_ENABLED: Set to "true" to capture prompts/completions
+    AZURE_LIVE_METRICS: Set to "true" to stream Live Metrics (keeps a background channel open)
+    OTEL_BSP_*: Span export batching (queue size, batch size, delay, timeout)
+    OTEL_TRACES_SAMPLER_ARG: Fraction of traces to keep, 0.0-1.0 (default: 1.0)
 """
 
 import os
+import importlib
 import logging
-from functools import wraps
-from typing import Optional, Callable, Any
+from contextlib import contextmanager
+from typing import Optional, Any
 
 logger = logging.getLogger(__name__)
 
-# Global tracer instance
+# Bound once at import; the span helpers below run several times per request
+try:
+    from opentelemetry import trace as _otel_trace
+    _get_current_span = _otel_trace.get_current_span
+except ImportError:
+    _otel_trace = None
+    
+    def _get_current_span():
+        """No current span without OpenTelemetry installed."""
+        return None
+
+# Application Insights keeps at most 8192 characters of a custom property, so
+# longer string attributes are truncated when set instead of being serialized
+# in full by the exporter and cut server-side
+SPAN_ATTRIBUTE_LENGTH_LIMIT = 8192
+
+# Export settings for the BatchSpanProcessor that configure_azure_monitor
+# installs; the SDK reads them from the environment, so these only fill in
+# values the deployment has not set. Larger, less frequent batches amortize
+# encoding and the HTTPS round trip, and the deeper queue absorbs bursts
+# instead of dropping spans.
+BATCH_SPAN_PROCESSOR_DEFAULTS = {
+    "OTEL_BSP_MAX_QUEUE_SIZE": "4096",
+    "OTEL_BSP_MAX_EXPORT_BATCH_SIZE": "1024",
+    "OTEL_BSP_SCHEDULE_DELAY": "2000",
+    "OTEL_BSP_EXPORT_TIMEOUT": "10000",
+}
+
+# Fraction of traces kept when OTEL_TRACES_SAMPLER_ARG is not set. Every
+# request is traced by default so each interaction can be found in
+# Application Insights; lower it (e.g. 0.1) under sustained load.
+DEFAULT_TRACE_SAMPLING_RATIO = 1.0
+
+# Attribute value types passed to the SDK as-is; an exact type lookup is
+# cheaper than an isinstance walk over a tuple on every attribute
+_SCALAR_ATTRIBUTE_TYPES = frozenset({bool, int, float})
+
+# Libraries instrumented by setup_tracing: (label, module, instrumentor class)
+INSTRUMENTORS = (
+    ("FastAPI", "opentelemetry.instrumentation.fastapi", "FastAPIInstrumentor"),
+    ("Requests library", "opentelemetry.instrumentation.requests", "RequestsInstrumentor"),
+)
+
+# Instrumentor modules already applied in this process
+_instrumented: set[str] = set()
+
+# Global tracer instance and its bound start_as_current_span method
 _tracer = None
+_start_as_current_span = None
 _tracing_initialized = False
 
 
+def _set_tracer(tracer) -> None:
+    """Store the tracer and bind its span factory for per-call use."""
+    global _tracer, _start_as_current_span
+    _tracer = tracer
+    _start_as_current_span = tracer.start_as_current_span
+
+
 def setup_tracing(
     service_name: str = "rag-application",
     connection_string: Optional[str] = None
@@ -39,7 +97,7 @@ def setup_tracing(
     Returns:
         True if tracing was successfully initialized, False otherwise
     """
-    global _tracer, _tracing_initialized
+    global _tracing_initialized
     
     if _tracing_initialized:
         logger.info("Tracing already initialized")
@@ -65,41 +123,40 @@ def setup_tracing(
         # Enable content recording for AI operations (prompts and completions)
         os.environ["AZURE_TRACING_GEN_AI_CONTENT_RECORDING_ENABLED"] = "true"
         os.environ["AZURE_SDK_TRACING_IMPLEMENTATION"] = "opentelemetry"
+        for name, value in BATCH_SPAN_PROCESSOR_DEFAULTS.items():
+            os.environ.setdefault(name, value)
         
         # Use azure-monitor-opentelemetry for simplified setup with automatic version compatibility
         from azure.monitor.opentelemetry import configure_azure_monitor
-        from opentelemetry import trace
         
         # Configure Azure Monitor with the connection string
+        monitor_options = {}
+        if not os.environ.get("OTEL_TRACES_SAMPLER"):
+            # Head sampling: the decision is made when the root span starts and
+            # shared by its children via the trace ID, so unsampled requests
+            # create non-recording spans and skip attribute building entirely
+            monitor_options["sampling_ratio"] = _trace_sampling_ratio()
         configure_azure_monitor(
             connection_string=conn_string,
-            enable_live_metrics=True,
+            enable_live_metrics=os.environ.get("AZURE_LIVE_METRICS", "false").lower() == "true",
+            **monitor_options,
         )
         
         # Get tracer for this application
-        _tracer = trace.get_tracer(service_name, "1.0.0")
-        
-        # Instrument FastAPI
-        try:
-            from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-            FastAPIInstrumentor().instrument()
-            logger.info("FastAPI instrumented for tracing")
-        except ImportError:
-            logger.debug("FastAPI instrumentation not available")
-        except Exception as e:
-            logger.warning(f"Failed to instrument FastAPI: {e}")
+        _set_tracer(_otel_trace.get_tracer(service_name, "1.0.0"))
         
-        # Instrument HTTP requests
-        try:
-            from opentelemetry.instrumentation.requests import RequestsInstrumentor
-            RequestsInstrumentor().instrument()
-            logger.info("Requests library instrumented for tracing")
-        except ImportError:
-            logger.debug("Requests instrumentation not available")
-        except Exception as e:
-            logger.warning(f"Failed to instrument requests: {e}")
-        except Exception as e:
-            logger.warning(f"Failed to instrument requests: {e}")
+        # Instrument FastAPI and HTTP requests
+        for label, module_name, class_name in INSTRUMENTORS:
+            if module_name in _instrumented:
+                continue
+            try:
+                getattr(importlib.import_module(module_name), class_name)().instrument()
+                _instrumented.add(module_name)
+                logger.info(f"{label} instrumented for tracing")
+            except ImportError:
+                logger.debug(f"{label} instrumentation not available")
+            except Exception as e:
+                logger.warning(f"Failed to instrument {label}: {e}")
         
         _tracing_initialized = True
         logger.info(f"✅ Tracing initialized successfully for service: {service_name}")
@@ -118,6 +175,17 @@ def setup_tracing(
         return False
 
 
+def _trace_sampling_ratio() -> float:
+    """Read the trace sampling ratio from OTEL_TRACES_SAMPLER_ARG."""
+    value = os.environ.get("OTEL_TRACES_SAMPLER_ARG", "")
+    try:
+        ratio = float(value) if value else DEFAULT_TRACE_SAMPLING_RATIO
+    except ValueError:
+        logger.warning(f"Invalid OTEL_TRACES_SAMPLER_ARG '{value}', sampling all traces")
+        return DEFAULT_TRACE_SAMPLING_RATIO
+    return min(max(ratio, 0.0), 1.0)
+
+
 def get_tracer():
     """
     Get the configured tracer instance.
@@ -125,101 +193,49 @@ def get_tracer():
     Returns:
         OpenTelemetry tracer or None if tracing is not initialized
     """
-    global _tracer
-    
-    if _tracer is None and not _tracing_initialized:
+    if _tracer is None and not _tracing_initialized and _otel_trace is not None:
         # Try to get a tracer from the global provider
         try:
-            from opentelemetry import trace
-            _tracer = trace.get_tracer(__name__, "1.0.0")
+            _set_tracer(_otel_trace.get_tracer(__name__, "1.0.0"))
         except Exception:
             pass
     
     return _tracer
 
 
-def trace_span(
-    name: str,
-    attributes: Optional[dict] = None
-):
+@contextmanager
+def maybe_span(name: str):
     """
-    Decorator to trace a function with a custom span.
+    Start a span only when tracing is active.
     
-    Args:
-        name: Name of the span
-        attributes: Optional attributes to add to the span
+    Yields the span while it is recording, or None when tracing is disabled or
+    the span is not sampled, so callers can skip building attribute values
+    that would be discarded.
     
-    Example:
-        @trace_span("search_documents", {"search.type": "hybrid"})
-        def search_documents(query: str):
-            ...
-    """
-    def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(*args, **kwargs) -> Any:
-            tracer = get_tracer()
-            
-            if tracer is None:
-                # Tracing not available, just call the function
-                return func(*args, **kwargs)
-            
-            with tracer.start_as_current_span(name) as span:
-                # Add custom attributes
-                if attributes:
-                    for key, value in attributes.items():
-                        span.set_attribute(key, value)
-                
-                try:
-                    result = func(*args, **kwargs)
-                    span.set_attribute("status", "success")
-                    return result
-                except Exception as e:
-                    span.set_attribute("status", "error")
-                    span.set_attribute("error.message", str(e))
-                    span.record_exception(e)
-                    raise
-        
-        return wrapper
-    return decorator
-
-
-def start_span(name: str, attributes: Optional[dict] = None):
-    """
-    Start a new span manually for more complex tracing scenarios.
-    
-    Args:
-        name: Name of the span
-        attributes: Optional attributes to add to the span
-    
-    Returns:
-        Context manager for the span, or a no-op context if tracing is disabled
+    Exceptions are not recorded automatically; callers record them with
+    record_exception as before.
     
     Example:
-        with start_span("rag_workflow", {"query": user_query}) as span:
-            span.set_attribute("step", "search")
-            documents = search(query)
-            span.set_attribute("documents_found", len(documents))
+        with maybe_span("search_documents") as span:
+            if span is not None:
+                set_span_attributes({"search.query": query})
     """
-    tracer = get_tracer()
+    if _start_as_current_span is None and get_tracer() is None:
+        yield None
+        return
     
-    if tracer is None:
-        # Return a no-op context manager
-        from contextlib import nullcontext
-        return nullcontext()
-    
-    span = tracer.start_as_current_span(name)
-    
-    # We need to handle attributes after span starts
-    if attributes:
-        # Get the actual span object to set attributes
-        from opentelemetry import trace
-        current_span = trace.get_current_span()
-        if current_span:
-            for key, value in attributes.items():
-                if value is not None:
-                    current_span.set_attribute(key, value)
-    
-    return span
+    with _start_as_current_span(
+        name, record_exception=False, set_status_on_exception=False
+    ) as span:
+        yield span if span.is_recording() else None
+
+
+def _attribute_value(value: Any) -> Any:
+    """Convert a value to a supported attribute type, truncating long strings."""
+    if type(value) in _SCALAR_ATTRIBUTE_TYPES:
+        return value
+    # Convert to string if not a supported type
+    return str(value)[:SPAN_ATTRIBUTE_LENGTH_LIMIT]
 
 
 def add_span_attribute(key: str, value: Any) -> None:
@@ -230,17 +246,28 @@ def add_span_attribute(key: str, value: Any) -> None:
         key: Attribute name
         value: Attribute value
     """
-    try:
-        from opentelemetry import trace
-        span = trace.get_current_span()
-        if span and value is not None:
-            # Convert to string if not a supported type
-            if isinstance(value, (str, bool, int, float)):
-                span.set_attribute(key, value)
-            else:
-                span.set_attribute(key, str(value))
-    except Exception:
-        pass  # Silently ignore if tracing is not available
+    span = _get_current_span()
+    if span and value is not None:
+        span.set_attribute(key, _attribute_value(value))
+
+
+def set_span_attributes(attributes: dict) -> None:
+    """
+    Add several attributes to the current span in one call.
+    
+    Prefer this over repeated add_span_attribute calls: it looks up the
+    current span once and hands the whole mapping to the SDK together.
+    
+    Args:
+        attributes: Mapping of attribute name to value (None values are skipped)
+    """
+    span = _get_current_span()
+    if span:
+        span.set_attributes({
+            key: _attribute_value(value)
+            for key, value in attributes.items()
+            if value is not None
+        })
 
 
 def add_span_event(name: str, attributes: Optional[dict] = None) -> None:
@@ -251,13 +278,9 @@ def add_span_event(name: str, attributes: Optional[dict] = None) -> None:
         name: Event name
         attributes: Optional event attributes
     """
-    try:
-        from opentelemetry import trace
-        span = trace.get_current_span()
-        if span:
-            span.add_event(name, attributes=attributes or {})
-    except Exception:
-        pass  # Silently ignore if tracing is not available
+    span = _get_current_span()
+    if span:
+        span.add_event(name, attributes=attributes or {})
 
 
 def record_exception(exception: Exception) -> None:
@@ -267,12 +290,7 @@ def record_exception(exception: Exception) -> None:
     Args:
         exception: The exception to record
     """
-    try:
-        from opentelemetry import trace
-        span = trace.get_current_span()
-        if span:
-            span.record_exception(exception)
-            span.set_attribute("error", True)
-            span.set_attribute("error.message", str(exception))
-    except Exception:
-        pass  # Silently ignore if tracing is not available
+    span = _get_current_span()
+    if span:
+        span.record_exception(exception)
+        span.set_attributes({"error": True, "error.message": str(exception)})
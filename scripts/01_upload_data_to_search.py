@@ -1,10 +1,9 @@
 """Upload PDF files to Azure AI Search with page-aware chunking and sentence boundaries."""
 
 import os
-import json
 import re
 from pathlib import Path
-from dotenv import load_dotenv
+from _env import load_azd_env
 from azure.identity import DefaultAzureCredential
 from openai import AzureOpenAI
 from azure.search.documents import SearchClient
@@ -26,16 +25,7 @@ from azure.search.documents.indexes.models import (
 from pypdf import PdfReader
 
 # Load environment from azd
-azure_dir = Path(__file__).parent.parent / ".azure"
-env_name = os.environ.get("AZURE_ENV_NAME", "")
-if not env_name and (azure_dir / "config.json").exists():
-    with open(azure_dir / "config.json") as f:
-        config = json.load(f)
-        env_name = config.get("defaultEnvironment", "")
-
-env_path = azure_dir / env_name / ".env"
-if env_path.exists():
-    load_dotenv(env_path)
+load_azd_env()
 
 INDEX_NAME = "documents"
 CHUNK_SIZE = 1000
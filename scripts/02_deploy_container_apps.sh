@@ -107,6 +107,7 @@ az containerapp update \
         "AZURE_OPENAI_ENDPOINT=$AZURE_OPENAI_ENDPOINT" \
         "AZURE_AI_SEARCH_ENDPOINT=$AZURE_AI_SEARCH_ENDPOINT" \
         "AZURE_OPENAI_CHAT_DEPLOYMENT=${AZURE_CHAT_MODEL:-gpt-4o-mini}" \
+        "AZURE_EMBEDDING_MODEL=${AZURE_EMBEDDING_MODEL:-text-embedding-3-large}" \
         "AZURE_SEARCH_INDEX_NAME=${AZURE_SEARCH_INDEX_NAME:-documents}" \
         "APPLICATIONINSIGHTS_CONNECTION_STRING=$AZURE_APPINSIGHTS_CONNECTION_STRING"
 
@@ -4,24 +4,34 @@ Creates the agent and saves its ID to the .env file for later use.
 """
 
 import os
-import json
-from pathlib import Path
-from dotenv import load_dotenv, set_key
+import re
+import stat
+import tempfile
+from functools import lru_cache
 from azure.identity import DefaultAzureCredential
 from azure.ai.agents import AgentsClient
 from azure.ai.agents.models import AzureAISearchTool, AzureAISearchQueryType
 
+from _env import load_azd_env
+
 # Load environment from azd
-azure_dir = Path(__file__).parent.parent / ".azure"
-env_name = os.environ.get("AZURE_ENV_NAME", "")
-if not env_name and (azure_dir / "config.json").exists():
-    with open(azure_dir / "config.json") as f:
-        config = json.load(f)
-        env_name = config.get("defaultEnvironment", "")
+env_path = load_azd_env()
 
-env_path = azure_dir / env_name / ".env"
-if env_path.exists():
-    load_dotenv(env_path)
+
+@lru_cache(maxsize=1)
+def get_credential() -> DefaultAzureCredential:
+    """
+    Create the credential once and reuse it for every client.
+    
+    Credential sources a workshop machine never has are excluded so the
+    chain only probes environment, managed identity and the az/azd logins.
+    """
+    return DefaultAzureCredential(
+        exclude_interactive_browser_credential=True,
+        exclude_visual_studio_code_credential=True,
+        exclude_shared_token_cache_credential=True,
+        exclude_powershell_credential=True,
+    )
 
 
 def get_agents_client():
@@ -32,7 +42,7 @@ def get_agents_client():
     
     return AgentsClient(
         endpoint=endpoint,
-        credential=DefaultAzureCredential(),
+        credential=get_credential(),
     )
 
 
@@ -64,10 +74,45 @@ If you cannot find relevant information, say so clearly.""",
     return agent
 
 
+def set_env_value(path, key: str, value: str):
+    """
+    Set KEY="value" in a .env file without a partial rewrite.
+    
+    A new key is appended with a single O_APPEND write, so lines added by
+    other processes are kept. An existing key is replaced by writing the
+    updated file next to it and renaming it over the original, so readers
+    never see a half-written file.
+    """
+    line = f'{key}="{value}"'.encode()
+    content = path.read_bytes()
+    pattern = re.compile(rb"^(?:export\s+)?" + re.escape(key.encode()) + rb"=.*$", re.MULTILINE)
+    
+    if not pattern.search(content):
+        prefix = b"\n" if content and not content.endswith(b"\n") else b""
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(fd, prefix + line + b"\n")
+        finally:
+            os.close(fd)
+        return
+    
+    updated = pattern.sub(lambda _: line, content)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(updated)
+        # mkstemp creates the file as 0600; keep the .env file's own mode
+        os.chmod(tmp_path, stat.S_IMODE(path.stat().st_mode))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
 def save_agent_id(agent_id: str):
     """Save agent ID to .env file."""
     if env_path.exists():
-        set_key(str(env_path), "AZURE_AGENT_ID", agent_id)
+        set_env_value(env_path, "AZURE_AGENT_ID", agent_id)
         print(f"Saved AZURE_AGENT_ID={agent_id} to {env_path}")
     else:
         print(f"Warning: .env file not found at {env_path}")
@@ -5,34 +5,69 @@ Results are uploaded to Azure AI Foundry portal for analysis
 """
 
 import os
-import json
-import contextlib
-import multiprocessing
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
-from typing import TypedDict
-from pprint import pprint
+from typing import Optional, TypedDict
 
-import pandas as pd
-from dotenv import load_dotenv
-from azure.identity import DefaultAzureCredential
-from azure.ai.evaluation import evaluate
-from azure.ai.evaluation import RelevanceEvaluator, GroundednessEvaluator
-from azure.ai.evaluation import AzureOpenAIModelConfiguration
+from _env import load_azd_env
 
 # ----------------------------------------------
 # Load environment from azd
 # ----------------------------------------------
-azure_dir = Path(__file__).parent.parent / ".azure"
-env_name = os.environ.get("AZURE_ENV_NAME", "")
-if not env_name and (azure_dir / "config.json").exists():
-    with open(azure_dir / "config.json") as f:
-        config = json.load(f)
-        env_name = config.get("defaultEnvironment", "")
+load_azd_env()
 
-env_path = azure_dir / env_name / ".env"
-if env_path.exists():
-    load_dotenv(env_path)
+
+# ----------------------------------------------
+# Shared HTTP Session
+# ----------------------------------------------
+# The evaluation SDK calls the target once per row, several rows at a
+# time; a pooled keep-alive session reuses TCP/TLS connections across
+# those calls instead of reconnecting for every question. Connect errors,
+# throttling and gateway errors from the Container App are retried; read
+# timeouts are not, since the backend may still be generating the answer
+# and a retry would repeat the LLM call.
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        read=False,
+        backoff_factor=0.3,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=frozenset({"GET", "POST"}),
+        raise_on_status=False,
+    ),
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+
+# ----------------------------------------------
+# Chat Request Template
+# ----------------------------------------------
+# Built once per process: spawned evaluation workers re-import this module
+# (loading the .env file above), so only the message changes per question
+_BACKEND_URL = os.getenv("AZURE_CONTAINER_APP_URL", "")
+_CHAT_URL = f"{_BACKEND_URL}/chat"
+_CHAT_HEADERS = {"Content-Type": "application/json"}
+# (connect, read): fail fast on an unreachable backend; the read budget
+# fits a non-streamed max_tokens=2048 completion and is never retried
+_CHAT_TIMEOUT = (5, 60)
+_CHAT_PAYLOAD = {
+    "conversation_history": [],
+    "system_prompt": "You are a helpful AI assistant. Provide clear, accurate, and helpful responses.",
+    "max_tokens": 2048,
+    # Evaluate fresh answers, not cached ones generated for similar queries
+    "cache": False
+}
+# Pre-encoded around the message; concatenated rather than %-formatted so
+# a "%" in the payload cannot break it
+_CHAT_BODY_PREFIX = b'{"message":'
+_CHAT_BODY_SUFFIX = b"," + orjson.dumps(_CHAT_PAYLOAD)[1:]
 
 
 # ----------------------------------------------
@@ -58,10 +93,7 @@ def evaluate_target_application(question: str) -> TargetResponse:
     Returns:
         TargetResponse with response and context for evaluation
     """
-    # Read BACKEND_URL from environment each time to support multiprocessing
-    backend_url = os.getenv("AZURE_CONTAINER_APP_URL", "")
-    
-    if not backend_url:
+    if not _BACKEND_URL:
         return TargetResponse(
             response="Error: AZURE_CONTAINER_APP_URL not set",
             context=""
@@ -69,20 +101,15 @@ def evaluate_target_application(question: str) -> TargetResponse:
     
     try:
         # Call the /chat endpoint of the Container App
-        response = requests.post(
-            f"{backend_url}/chat",
-            json={
-                "message": question,
-                "conversation_history": [],
-                "system_prompt": "You are a helpful AI assistant. Provide clear, accurate, and helpful responses.",
-                "max_tokens": 2048
-            },
-            headers={"Content-Type": "application/json"},
-            timeout=120
+        response = _SESSION.post(
+            _CHAT_URL,
+            data=_CHAT_BODY_PREFIX + orjson.dumps(question) + _CHAT_BODY_SUFFIX,
+            headers=_CHAT_HEADERS,
+            timeout=_CHAT_TIMEOUT
         )
         response.raise_for_status()
         
-        result = response.json()
+        result = orjson.loads(response.content)
         
         # Extract the answer from the response
         # Adjust these fields based on your API response structure
@@ -111,15 +138,64 @@ def evaluate_target_application(question: str) -> TargetResponse:
             response=f"Error: {str(e)}",
             context=""
         )
+    except orjson.JSONDecodeError as e:
+        print(f"Invalid JSON from target application: {e}")
+        return TargetResponse(
+            response=f"Error: {str(e)}",
+            context=""
+        )
+
+
+# ----------------------------------------------
+# Skip LLM Judges for Failed Target Calls
+# ----------------------------------------------
+class SkipErrorResponses:
+    """
+    Evaluator wrapper that does not call the LLM judge on target errors.
+    
+    The target answers "Error: ..." when the Container App call fails;
+    judging that text costs an Azure OpenAI round-trip and only adds a
+    meaningless low score, so those rows get a NaN metric instead, which
+    the summary means ignore.
+    """
+    
+    def __init__(self, evaluator, metric: str):
+        self._evaluator = evaluator
+        self._metric = metric
+    
+    def __call__(self, *, query: str, response: str, context: Optional[str] = None):
+        if response.startswith("Error:"):
+            return {
+                self._metric: float("nan"),
+                f"{self._metric}_reason": "Skipped: the target application returned an error"
+            }
+        if context is None:
+            return self._evaluator(query=query, response=response)
+        return self._evaluator(query=query, response=response, context=context)
 
 
 # ----------------------------------------------
 # Main Evaluation Runner
 # ----------------------------------------------
 if __name__ == "__main__":
-    # Workaround for multiprocessing issue on linux
-    with contextlib.suppress(RuntimeError):
-        multiprocessing.set_start_method("spawn", force=True)
+    # Everything only the runner needs is imported here: spawned evaluation
+    # workers re-import this module for the target function and should load
+    # just what it uses (requests, orjson and the .env loader)
+    import contextlib
+    import multiprocessing
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from pprint import pprint
+    
+    from azure.ai.evaluation import evaluate
+    from azure.ai.evaluation import RelevanceEvaluator, GroundednessEvaluator
+    from azure.ai.evaluation import AzureOpenAIModelConfiguration
+    
+    # The target is HTTP-bound and runs on the evaluator's worker threads;
+    # only switch to spawned processes when asked to
+    if os.environ.get("AZURE_EVAL_USE_PROCESSES") == "1":
+        # Workaround for multiprocessing issue on linux
+        with contextlib.suppress(RuntimeError):
+            multiprocessing.set_start_method("spawn", force=True)
     
     # Get backend URL
     backend_url = os.environ.get("AZURE_CONTAINER_APP_URL", "")
@@ -142,8 +218,8 @@ if __name__ == "__main__":
     )
     
     # Initialize evaluators
-    relevance_eval = RelevanceEvaluator(model_config)
-    groundedness_eval = GroundednessEvaluator(model_config)
+    relevance_eval = SkipErrorResponses(RelevanceEvaluator(model_config), "relevance")
+    groundedness_eval = SkipErrorResponses(GroundednessEvaluator(model_config), "groundedness")
     
     # Path to evaluation data
     data_path = Path(__file__).parent.parent / "evals" / "ground_truth_small.jsonl"
@@ -151,6 +227,7 @@ if __name__ == "__main__":
     output_dir = Path(__file__).parent.parent / "evals" / "results" / "quality"
     output_dir.mkdir(parents=True, exist_ok=True)
     output_path = output_dir / "results_target.jsonl"
+    rows_path = output_dir / "results_target_rows.jsonl"
     
     if not data_path.exists():
         # Try the full ground truth file
@@ -162,24 +239,43 @@ if __name__ == "__main__":
     
     # Check if backend is accessible
     print(f"\nChecking backend connectivity...")
-    try:
-        # Try health check endpoint first
-        health_url = f"{backend_url}/api/health"
-        health_check = requests.get(health_url, timeout=10)
-        print(f"✅ Backend is accessible at {backend_url}")
-    except requests.exceptions.RequestException:
+    # Probe the health endpoint and the root URL in parallel; the backend is
+    # reachable as soon as either one answers. A cold start longer than the
+    # probe timeout is absorbed by the warmup request below
+    probe_error = None
+    executor = ThreadPoolExecutor(max_workers=2)
+    probes = [
+        executor.submit(_SESSION.get, f"{backend_url}/api/health", timeout=10),
+        executor.submit(_SESSION.get, backend_url, timeout=10),
+    ]
+    for probe in as_completed(probes):
         try:
-            # Try root endpoint as fallback
-            root_check = requests.get(backend_url, timeout=10)
-            print(f"✅ Backend is accessible at {backend_url}")
+            probe.result()
+            probe_error = None
+            break
         except requests.exceptions.RequestException as e:
-            print(f"⚠️  Warning: Cannot connect to backend at {backend_url}")
-            print(f"   Error: {e}")
-            print(f"\n   Make sure the Container App is running.")
-            print(f"   If the app is idle, it may take a moment to start.")
-            response = input("\nContinue anyway? (y/n): ")
-            if response.lower() != 'y':
-                exit(1)
+            probe_error = e
+    # Do not wait for the slower probe once one has answered
+    executor.shutdown(wait=False, cancel_futures=True)
+    
+    if probe_error is None:
+        print(f"✅ Backend is accessible at {backend_url}")
+    else:
+        print(f"⚠️  Warning: Cannot connect to backend at {backend_url}")
+        print(f"   Error: {probe_error}")
+        print(f"\n   Make sure the Container App is running.")
+        print(f"   If the app is idle, it may take a moment to start.")
+        response = input("\nContinue anyway? (y/n): ")
+        if response.lower() != 'y':
+            exit(1)
+    
+    # Send one chat request before the sweep so the container cold start and
+    # the app's search/model connections are not paid by the first rows, and
+    # the pooled session already holds an open connection
+    print(f"\nWarming up {_CHAT_URL}...")
+    warmup = evaluate_target_application("Hello")
+    if warmup["response"].startswith("Error:"):
+        print(f"⚠️  Warning: warmup request failed: {warmup['response']}")
     
     print(f"\n🔍 Starting evaluation of target application...")
     print(f"   Backend URL: {backend_url}")
@@ -216,16 +312,28 @@ if __name__ == "__main__":
         output_path=str(output_path),
     )
     
-    # Display results
-    tabular_result = pd.DataFrame(result.get("rows"))
+    # Write one JSON line per evaluated row; evaluate() already saved the
+    # full result document to output_path
+    rows = result.get("rows", [])
+    with open(rows_path, "wb") as f:
+        for row in rows:
+            f.write(orjson.dumps(row) + b"\n")
     
+    # Display results
     print("\n" + "=" * 60)
     print("--- Summarized Metrics ---")
     pprint(result["metrics"])
-    print("\n--- Tabular Result ---")
-    pprint(tabular_result)
+    print("\n--- Row Scores ---")
+    for i, row in enumerate(rows, 1):
+        question = row.get("inputs.question", "")
+        print(
+            f"[{i}] relevance={row.get('outputs.relevance.relevance')} "
+            f"groundedness={row.get('outputs.groundedness.groundedness')} "
+            f"| {question[:60]}{'...' if len(question) > 60 else ''}"
+        )
     print("\n--- Evaluation Complete ---")
     print(f"Results saved to: {output_path}")
+    print(f"Rows saved to: {rows_path}")
     
     if "studio_url" in result:
         print(f"\n🔗 View evaluation results in Microsoft Foundry:")
@@ -248,7 +356,8 @@ if __name__ == "__main__":
 #    - Format: Each line should have "question" and "truth" fields
 #    - Example: {"question": "What is Azure?", "truth": "Azure is..."}
 #
-# 3. Run the evaluation:
+# 3. Run the evaluation (set AZURE_EVAL_USE_PROCESSES=1 to use the
+#    spawn-based process workaround if the evaluator hangs on Linux):
 #    cd scripts
 #    python 03_run_evaltarget.py
 #
@@ -256,7 +365,8 @@ if __name__ == "__main__":
 #   - Calls your Container App for each question in the data file
 #   - Evaluates relevance of responses to questions
 #   - Evaluates groundedness of responses against ground truth
-#   - Saves results locally to evals/results_target.jsonl
+#   - Saves results locally to evals/results/quality/results_target.jsonl
+#     and one line per row to evals/results/quality/results_target_rows.jsonl
 #   - Uploads results to Azure AI Foundry portal
 #   - Displays summarized metrics and tabular results
 # ----------------------------------------------
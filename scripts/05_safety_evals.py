@@ -4,19 +4,20 @@ import os
 import json
 import asyncio
 import logging
+import tempfile
+from contextlib import contextmanager, suppress
+from functools import lru_cache, partial
 from pathlib import Path
 from pprint import pprint
+from typing import Awaitable, Callable, Optional
 
-import pandas as pd
-import requests
-from dotenv import load_dotenv
-from azure.identity import DefaultAzureCredential, AzureDeveloperCliCredential
-from azure.ai.evaluation import ContentSafetyEvaluator, evaluate
-from azure.ai.evaluation.simulator import (
-    AdversarialScenario,
-    AdversarialSimulator,
-    SupportedLanguages,
-)
+import aiohttp
+import orjson
+from _credentials import CachedTokenCredential
+from _env import load_azd_env
+
+# azure-identity and azure-ai-evaluation are imported in the
+# functions that use them, so `--help` and argument errors return at once
 
 # Setup logging
 logging.basicConfig(level=logging.WARNING, format="%(message)s")
@@ -24,76 +25,363 @@ logger = logging.getLogger("safety_eval")
 logger.setLevel(logging.INFO)
 
 # Load environment from azd
-azure_dir = Path(__file__).parent.parent / ".azure"
-env_name = os.environ.get("AZURE_ENV_NAME", "")
-if not env_name and (azure_dir / "config.json").exists():
-    with open(azure_dir / "config.json") as f:
-        config = json.load(f)
-        env_name = config.get("defaultEnvironment", "")
-
-env_path = azure_dir / env_name / ".env"
-if env_path.exists():
-    load_dotenv(env_path)
+load_azd_env()
 
 OUTPUT_DIR = Path(__file__).parent.parent / "evals" / "results" / "safety"
 
+# Backend calls in flight at once during simulation
+DEFAULT_CONCURRENCY = int(os.getenv("SAFETY_EVAL_CONCURRENCY", "8"))
+
+# Queries per /chat/batch request (1 sends each query to /chat on its own);
+# batches never hold more queries than the concurrency allows in flight
+DEFAULT_BATCH_SIZE = int(os.getenv("SAFETY_EVAL_BATCH_SIZE", "1"))
+
+# How long the first queued query waits for others to join its batch
+BATCH_WINDOW_SECONDS = 0.01
+
+# Upper bound on concurrent evaluator rows (RAI service calls) in evaluate()
+MAX_EVAL_WORKERS = 16
+
+# Request options shared by every simulated query
+CHAT_OPTIONS = {
+    "conversation_history": [],
+    "system_prompt": "You are a helpful AI assistant. Provide clear, accurate, and helpful responses.",
+    "max_tokens": 2048,
+    # Evaluate fresh answers, not cached ones generated for similar queries
+    "cache": False
+}
+
+# Chat request body with the options pre-encoded; only the message is
+# encoded per query and concatenated in (not %-formatted, so a "%" in the
+# options cannot break it)
+_CHAT_BODY_PREFIX = b'{"message":'
+_CHAT_BODY_SUFFIX = b"," + orjson.dumps(CHAT_OPTIONS)[1:]
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Fail fast when the backend is unreachable; the read budget still fits a
+# non-streamed max_tokens=2048 completion
+TARGET_TIMEOUT = aiohttp.ClientTimeout(total=90, connect=5, sock_read=60)
+
+# Gateway errors from the Container App are retried once; timeouts are not
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+# Statuses meaning the target has no /chat/batch endpoint
+BATCH_UNSUPPORTED_STATUSES = frozenset({404, 405})
+
+# Answers returned to the simulator when the backend rejects or times out
+# on a query; these are never cached
+REFUSAL_RESPONSE = "I cannot process that request."
+TIMEOUT_RESPONSE = "I cannot process that request at this time."
+
+# Backend answers by query text for this run (disabled with --no-cache)
+_RESPONSE_CACHE: dict[str, str] = {}
+
+# Pieces of one simulation data line around the orjson-encoded strings
+_ROW_PREFIX = b'{"query":'
+_ROW_MIDDLE = b',"response":'
+_ROW_SUFFIX = b"}\n"
 
-def get_azure_credential():
-    """Get Azure credential for evaluation."""
+
+def _zstandard():
+    """Import zstandard, which only --compress needs."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("--compress requires the 'zstandard' package: pip install zstandard") from e
+    return zstandard
+
+
+@contextmanager
+def _plain_jsonl(data_path: str):
+    """Yield a JSONL path evaluate() can read, decompressing .jsonl.zst to a temporary file."""
+    if not data_path.endswith(".zst"):
+        yield data_path
+        return
+    
+    with tempfile.TemporaryDirectory(dir=OUTPUT_DIR) as tmp_dir:
+        # x.jsonl.zst -> x.jsonl
+        plain_path = Path(tmp_dir) / Path(data_path).stem
+        with open(data_path, "rb") as src, open(plain_path, "wb") as dst:
+            _zstandard().ZstdDecompressor().copy_stream(src, dst)
+        yield str(plain_path)
+
+
+@lru_cache(maxsize=1)
+def get_azure_credential() -> CachedTokenCredential:
+    """Get the Azure credential shared by the simulator and the evaluator."""
+    from azure.identity import AzureDeveloperCliCredential
+    
     tenant_id = os.getenv("AZURE_TENANT_ID")
     if tenant_id:
-        return AzureDeveloperCliCredential(tenant_id=tenant_id, process_timeout=60)
-    return AzureDeveloperCliCredential(process_timeout=60)
+        return CachedTokenCredential(AzureDeveloperCliCredential(tenant_id=tenant_id, process_timeout=60))
+    return CachedTokenCredential(AzureDeveloperCliCredential(process_timeout=60))
+
+
+def _chat_body(query: str) -> bytes:
+    """Encode a /chat request body for a query."""
+    return _CHAT_BODY_PREFIX + orjson.dumps(query) + _CHAT_BODY_SUFFIX
+
+
+def _log_http_error(status: int, body: bytes) -> None:
+    """Log a failed backend response with the detail from its body."""
+    try:
+        detail = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        detail = None
+    # FastAPI errors are {"detail": ...}; anything else is shown as raw text
+    text = body[:200].decode(errors="replace")
+    error_detail = detail.get("detail", text) if isinstance(detail, dict) else text
+    logger.warning(f"Error calling target application: HTTP {status}. Detail: {error_detail}")
 
 
-def call_target_application(query: str) -> str:
+async def _post_target(
+    http_session: aiohttp.ClientSession,
+    url: str,
+    payload: bytes,
+    retry: bool = True
+) -> tuple[int, bytes]:
+    """
+    POST an encoded JSON body to the backend, retrying once on a gateway error.
+    
+    Args:
+        http_session: aiohttp session shared by the whole simulator run
+        url: Backend endpoint URL
+        payload: Encoded JSON request body
+        retry: Whether a gateway error is retried once
+    
+    Returns:
+        Tuple of (HTTP status, response body)
+    """
+    for attempt in range(2 if retry else 1):
+        async with http_session.post(url, data=payload, headers=_JSON_HEADERS, timeout=TARGET_TIMEOUT) as response:
+            body = await response.read()
+        if attempt or not retry or response.status not in RETRY_STATUSES:
+            break
+        logger.warning(f"HTTP {response.status} from target application, retrying once")
+    return response.status, body
+
+
+async def call_target_application(
+    http_session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    query: str
+) -> str:
     """
     Call the Container App backend API and return response.
     
     Args:
+        http_session: aiohttp session shared by the whole simulator run
+        semaphore: Limits how many backend calls are in flight at once
         query: The user question to ask the application
         
     Returns:
         Response string from the target application
     """
+    async with semaphore:
+        return await _ask_target(http_session, query)
+
+
+async def _ask_target(http_session: aiohttp.ClientSession, query: str) -> str:
+    """Ask the backend's /chat endpoint one question; the caller bounds concurrency."""
     backend_url = os.getenv("AZURE_CONTAINER_APP_URL", "")
     
     if not backend_url:
         return "Error: AZURE_CONTAINER_APP_URL not set"
     
     try:
-        response = requests.post(
-            f"{backend_url}/chat",
-            json={
-                "message": query,
-                "conversation_history": [],
-                "system_prompt": "You are a helpful AI assistant. Provide clear, accurate, and helpful responses.",
-                "max_tokens": 2048
-            },
-            headers={"Content-Type": "application/json"},
-            timeout=120
+        status, body = await _post_target(
+            http_session, f"{backend_url}/chat", _chat_body(query)
         )
-        response.raise_for_status()
+        if status >= 400:
+            # Log the error but return a safe response for the simulator
+            _log_http_error(status, body)
+            # Return a non-error response so the simulator can continue
+            return REFUSAL_RESPONSE
+        
+        result = orjson.loads(body)
         
-        result = response.json()
         answer = result.get("response", result.get("message", ""))
         
         return answer if answer else "No response"
         
-    except requests.exceptions.Timeout:
+    except asyncio.TimeoutError:
         logger.warning(f"Timeout calling target application for query: {query[:50]}...")
-        return "I cannot process that request at this time."
-    except requests.exceptions.RequestException as e:
-        # Log the error but return a safe response for the simulator
-        error_detail = ""
-        if hasattr(e, 'response') and e.response is not None:
-            try:
-                error_detail = e.response.json().get("detail", e.response.text[:200])
-            except:
-                error_detail = e.response.text[:200] if e.response.text else str(e)
-        logger.warning(f"Error calling target application: {e}. Detail: {error_detail}")
-        # Return a non-error response so the simulator can continue
-        return "I cannot process that request."
+        return TIMEOUT_RESPONSE
+    except aiohttp.ClientError as e:
+        logger.warning(f"Error calling target application: {e}")
+        return REFUSAL_RESPONSE
+    except orjson.JSONDecodeError as e:
+        logger.warning(f"Invalid JSON from target application: {e}")
+        return REFUSAL_RESPONSE
+
+
+async def call_target_application_batch(
+    http_session: aiohttp.ClientSession,
+    queries: list[str]
+) -> Optional[list[str]]:
+    """
+    Ask the backend several questions in one /chat/batch round trip.
+    
+    The batch is not retried on a gateway error, since that would repeat
+    every question in it; the caller bounds concurrency.
+    
+    Args:
+        http_session: aiohttp session shared by the whole simulator run
+        queries: The user questions to ask the application
+        
+    Returns:
+        One response string per query, in order, or None when the target has
+        no /chat/batch endpoint
+    """
+    backend_url = os.getenv("AZURE_CONTAINER_APP_URL", "")
+    
+    if not backend_url:
+        return ["Error: AZURE_CONTAINER_APP_URL not set"] * len(queries)
+    
+    try:
+        status, body = await _post_target(
+            http_session,
+            f"{backend_url}/chat/batch",
+            b'{"requests":[' + b",".join(_chat_body(query) for query in queries) + b"]}",
+            retry=False
+        )
+        if status in BATCH_UNSUPPORTED_STATUSES:
+            return None
+        if status >= 400:
+            _log_http_error(status, body)
+            return [REFUSAL_RESPONSE] * len(queries)
+        
+        result = orjson.loads(body)
+        
+        answers = []
+        for item in result["results"]:
+            if item.get("error"):
+                logger.warning(f"Error calling target application: {item['error'][:200]}")
+                answers.append(REFUSAL_RESPONSE)
+            else:
+                answers.append(item["response"].get("response") or "No response")
+        return answers
+        
+    except asyncio.TimeoutError:
+        logger.warning(f"Timeout calling target application for a batch of {len(queries)} queries")
+        return [TIMEOUT_RESPONSE] * len(queries)
+    except aiohttp.ClientError as e:
+        logger.warning(f"Error calling target application: {e}")
+        return [REFUSAL_RESPONSE] * len(queries)
+    except orjson.JSONDecodeError as e:
+        logger.warning(f"Invalid JSON from target application: {e}")
+        return [REFUSAL_RESPONSE] * len(queries)
+
+
+class QueryBatcher:
+    """
+    Coalesces concurrent target calls into /chat/batch requests.
+    
+    The first queued query waits up to BATCH_WINDOW_SECONDS for others, then
+    up to batch_size queries are posted together and each waiting caller
+    receives its own answer. Each caller holds a semaphore permit until it
+    is answered, so no more queries than the concurrency limit reach the
+    backend at once, batched or not. A target without /chat/batch is asked
+    one query at a time through /chat instead.
+    """
+    
+    def __init__(
+        self,
+        http_session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        batch_size: int,
+        window: float = BATCH_WINDOW_SECONDS
+    ):
+        self._http_session = http_session
+        self._semaphore = semaphore
+        self._batch_size = batch_size
+        self._window = window
+        self._queue: asyncio.Queue[tuple[str, asyncio.Future]] = asyncio.Queue()
+        self._collector: asyncio.Task | None = None
+        self._dispatches: set[asyncio.Task] = set()
+        self._batch_supported = True
+    
+    async def ask(self, query: str) -> str:
+        """Queue a query for the next batch and wait for its answer."""
+        if self._collector is None:
+            self._collector = asyncio.create_task(self._collect())
+        async with self._semaphore:
+            future = asyncio.get_running_loop().create_future()
+            self._queue.put_nowait((query, future))
+            return await future
+    
+    async def _collect(self) -> None:
+        """Group queued queries into batches and dispatch each one."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._window
+            while len(batch) < self._batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+    
+    async def _dispatch(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        """Post one batch and resolve the futures of its callers."""
+        queries = [query for query, _ in batch]
+        try:
+            answers = None
+            if self._batch_supported:
+                answers = await call_target_application_batch(self._http_session, queries)
+                if answers is None and self._batch_supported:
+                    self._batch_supported = False
+                    logger.warning("Target application has no /chat/batch endpoint; sending queries to /chat")
+            if answers is None:
+                answers = await asyncio.gather(*(_ask_target(self._http_session, query) for query in queries))
+            elif len(answers) != len(queries):
+                # Never leave a caller waiting: ask /chat for whatever the batch dropped
+                logger.warning(f"/chat/batch returned {len(answers)} results for {len(queries)} queries")
+                answers = answers[:len(queries)]
+                answers += await asyncio.gather(
+                    *(_ask_target(self._http_session, query) for query in queries[len(answers):])
+                )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), answer in zip(batch, answers):
+            if not future.done():
+                future.set_result(answer)
+    
+    async def aclose(self) -> None:
+        """Stop collecting batches."""
+        if self._collector is not None:
+            self._collector.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._collector
+
+
+def cached_ask(ask: Callable[[str], Awaitable[str]]) -> Callable[[str], Awaitable[str]]:
+    """
+    Wrap a target call so a repeated query reuses its first answer.
+    
+    Safety scores depend only on the (query, response) pair, so a query the
+    simulator emits again does not need another backend round trip.
+    """
+    async def ask_cached(query: str) -> str:
+        answer = _RESPONSE_CACHE.get(query)
+        if answer is None:
+            answer = await ask(query)
+            if answer not in (REFUSAL_RESPONSE, TIMEOUT_RESPONSE):
+                _RESPONSE_CACHE[query] = answer
+        return answer
+    
+    return ask_cached
 
 
 async def callback(
@@ -101,6 +389,8 @@ async def callback(
     stream: bool = False,
     session_state=None,
     context=None,
+    *,
+    ask: Callable[[str], Awaitable[str]],
 ):
     """Callback function for adversarial simulator that calls the target application."""
     messages_list = messages["messages"]
@@ -108,7 +398,7 @@ async def callback(
     query = latest_message["content"]
     
     try:
-        response_text = call_target_application(query)
+        response_text = await ask(query)
         message = {"content": response_text, "role": "assistant"}
         
         return {
@@ -121,8 +411,20 @@ async def callback(
         }
 
 
-async def run_simulator(max_simulations: int):
-    """Run adversarial simulator and save outputs."""
+async def run_simulator(
+    max_simulations: int,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    compress: bool = False,
+    cache_responses: bool = True
+):
+    """Run adversarial simulator and save outputs (zstd-compressed when compress is set)."""
+    from azure.ai.evaluation.simulator import (
+        AdversarialScenario,
+        AdversarialSimulator,
+        SupportedLanguages,
+    )
+    
     credential = get_azure_credential()
     azure_ai_project = os.environ.get("AZURE_AI_PROJECT_ENDPOINT")
     
@@ -134,47 +436,81 @@ async def run_simulator(max_simulations: int):
     
     logger.info(f"Running adversarial simulation with {max_simulations} max simulations...")
     
-    outputs = await adversarial_simulator(
-        scenario=scenario,
-        target=callback,
-        max_simulation_results=max_simulations,
-        language=SupportedLanguages.English,
-        randomization_seed=1,
-    )
+    # One pooled session for every simulated conversation, so concurrent
+    # callbacks overlap their backend calls instead of blocking the loop;
+    # the semaphore keeps the backend at a steady number of requests and
+    # queues the rest here rather than in the Container App. With batching,
+    # queries arriving together share one /chat/batch round trip
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=32, keepalive_timeout=60)
+    async with aiohttp.ClientSession(connector=connector) as http_session:
+        batcher = None
+        if batch_size > 1:
+            batcher = QueryBatcher(http_session, semaphore, batch_size)
+            ask = batcher.ask
+        else:
+            ask = partial(call_target_application, http_session, semaphore)
+        if cache_responses:
+            ask = cached_ask(ask)
+        
+        try:
+            outputs = await adversarial_simulator(
+                scenario=scenario,
+                target=partial(callback, ask=ask),
+                max_simulation_results=max_simulations,
+                language=SupportedLanguages.English,
+                randomization_seed=1,
+            )
+        finally:
+            if batcher is not None:
+                await batcher.aclose()
     
     # Save simulation outputs
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    simulation_data_path = OUTPUT_DIR / "simulation_data_v1.jsonl"
+    simulation_data_path = OUTPUT_DIR / ("simulation_data_v1.jsonl.zst" if compress else "simulation_data_v1.jsonl")
     
     logger.info(f"Saving {len(outputs)} simulation outputs...")
-    valid_outputs = 0
+    # Keep conversations with a query and a non-empty response
+    pairs = [
+        (messages[0]["content"], response)
+        for output in outputs
+        if (messages := output.get("messages")) and len(messages) >= 2
+        and (response := messages[1].get("content"))
+    ]
     
-    with open(simulation_data_path, "w") as f:
-        for output in outputs:
-            if "messages" not in output or len(output["messages"]) < 2:
-                continue
-            
-            query = output["messages"][0]["content"]
-            response = output["messages"][1]["content"]
-            
-            if not response:
-                continue
-            
-            f.write(json.dumps({"query": query, "response": response}) + "\n")
-            valid_outputs += 1
+    # Each line is the two encoded strings joined with fixed pieces, with no
+    # per-row dict, and writelines hands the buffer all lines at once
+    lines = (
+        b"".join((_ROW_PREFIX, orjson.dumps(query), _ROW_MIDDLE, orjson.dumps(response), _ROW_SUFFIX))
+        for query, response in pairs
+    )
+    with open(simulation_data_path, "wb", buffering=65536) as f:
+        if compress:
+            # Prompts and refusal templates repeat heavily, so level 3 shrinks them well
+            compressor = _zstandard().ZstdCompressor(level=3, threads=-1)
+            with compressor.stream_writer(f, closefd=False) as writer:
+                writer.write(b"".join(lines))
+        else:
+            f.writelines(lines)
     
+    valid_outputs = len(pairs)
     logger.info(f"Saved {valid_outputs} valid outputs")
-    return azure_ai_project, str(simulation_data_path), valid_outputs
+    return credential, azure_ai_project, str(simulation_data_path), valid_outputs
 
 
-def run_safety_evaluation(azure_ai_project: str, data_path: str, num_simulations: int):
-    """Run safety evaluation."""
+def run_safety_evaluation(
+    credential: CachedTokenCredential,
+    azure_ai_project: str,
+    data_path: str,
+    num_simulations: int
+):
+    """Run safety evaluation with the credential the simulator used."""
+    from azure.ai.evaluation import ContentSafetyEvaluator, evaluate
+    
     if num_simulations == 0:
         logger.error("No valid simulation outputs to evaluate.")
         return
     
-    credential = get_azure_credential()
-    
     safety_evaluator = ContentSafetyEvaluator(
         credential=credential,
         azure_ai_project=azure_ai_project
@@ -184,30 +520,36 @@ def run_safety_evaluation(azure_ai_project: str, data_path: str, num_simulations
     logger.info(f"  Data file: {data_path}")
     logger.info(f"  Simulations: {num_simulations}")
     
-    result = evaluate(
-        data=data_path,
-        evaluators={"safety": safety_evaluator},
-        evaluator_config={
-            "safety": {
-                "column_mapping": {
-                    "query": "${data.query}",
-                    "response": "${data.response}"
+    # evaluate() scores rows on PF_WORKER_COUNT workers (4 by default); each
+    # row waits on the RAI service, so run one worker per row up to the cap
+    # unless the caller already set a count
+    os.environ.setdefault("PF_WORKER_COUNT", str(min(MAX_EVAL_WORKERS, num_simulations)))
+    
+    # evaluate() only reads plain JSONL
+    with _plain_jsonl(data_path) as plain_data_path:
+        result = evaluate(
+            data=plain_data_path,
+            evaluators={"safety": safety_evaluator},
+            evaluator_config={
+                "safety": {
+                    "column_mapping": {
+                        "query": "${data.query}",
+                        "response": "${data.response}"
+                    }
                 }
-            }
-        },
-        azure_ai_project=azure_ai_project,
-        evaluation_name="safety_evaluation_agent_v1",
-        output_path=str(OUTPUT_DIR / "safety_results_v1.jsonl")
-    )
+            },
+            azure_ai_project=azure_ai_project,
+            evaluation_name="safety_evaluation_agent_v1",
+            output_path=str(OUTPUT_DIR / "safety_results_v1.jsonl")
+        )
     
     # Display results
-    tabular_result = pd.DataFrame(result.get("rows"))
-    
     print("\n" + "=" * 50)
     print("--- Summarized Metrics ---")
     pprint(result["metrics"])
     print("\n--- Results Preview ---")
-    print(tabular_result.head())
+    for row in result.get("rows", [])[:5]:
+        print(row)
     print("\n--- Evaluation Complete ---")
     print(f"Results saved to: {OUTPUT_DIR / 'safety_results_v1.jsonl'}")
     
@@ -227,7 +569,32 @@ if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description="Run safety evaluation on target application")
     parser.add_argument("--max_simulations", type=int, default=5, help="Max adversarial simulations")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Concurrent calls to the target application (default: SAFETY_EVAL_CONCURRENCY or 8)"
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Queries per /chat/batch call, 1 to call /chat per query (default: SAFETY_EVAL_BATCH_SIZE or 1)"
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Write simulation data as zstd-compressed simulation_data_v1.jsonl.zst (requires zstandard)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Call the target application for every query, even ones already answered in this run"
+    )
     args = parser.parse_args()
+    if args.compress:
+        # Fail before the simulation rather than after it
+        _zstandard()
     
     # Verify backend URL
     backend_url = os.environ.get("AZURE_CONTAINER_APP_URL")
@@ -239,9 +606,15 @@ if __name__ == "__main__":
     print(f"Running safety evaluation on target application: {backend_url}")
     
     # Run simulation
-    azure_ai_project, data_path, num_simulations = asyncio.run(
-        run_simulator(args.max_simulations)
+    credential, azure_ai_project, data_path, num_simulations = asyncio.run(
+        run_simulator(
+            args.max_simulations,
+            args.concurrency,
+            args.batch_size,
+            args.compress,
+            cache_responses=not args.no_cache
+        )
     )
     
     # Run evaluation
-    run_safety_evaluation(azure_ai_project, data_path, num_simulations)
+    run_safety_evaluation(credential, azure_ai_project, data_path, num_simulations)
@@ -17,26 +17,22 @@ import asyncio
 from pathlib import Path
 from typing import Any, Dict
 from pprint import pprint
+import orjson
 import requests
-from dotenv import load_dotenv
+from _env import load_azd_env
 
 # ----------------------------------------------
 # Load environment from azd
 # ----------------------------------------------
-azure_dir = Path(__file__).parent.parent / ".azure"
-env_name = os.environ.get("AZURE_ENV_NAME", "")
-if not env_name and (azure_dir / "config.json").exists():
-    with open(azure_dir / "config.json") as f:
-        config = json.load(f)
-        env_name = config.get("defaultEnvironment", "")
-
-env_path = azure_dir / env_name / ".env"
-if env_path.exists():
-    load_dotenv(env_path)
+load_azd_env()
 
 # Output directory for results
 OUTPUT_DIR = Path(__file__).parent.parent / "evals" / "results" / "redteam"
 
+# (connect, read) for target calls: fail fast on an unreachable backend;
+# the read budget fits a non-streamed max_tokens=2048 completion
+CHAT_TIMEOUT = (5, 60)
+
 
 # ----------------------------------------------
 # 1. Define Target Callback Function
@@ -58,14 +54,16 @@ def target_application_callback(query: str) -> str:
                 "message": query,
                 "conversation_history": [],
                 "system_prompt": "You are a helpful AI assistant. Provide clear, accurate, and helpful responses.",
-                "max_tokens": 2048
+                "max_tokens": 2048,
+                # Evaluate fresh answers, not cached ones generated for similar queries
+                "cache": False
             },
             headers={"Content-Type": "application/json"},
-            timeout=120
+            timeout=CHAT_TIMEOUT
         )
         response.raise_for_status()
         
-        result = response.json()
+        result = orjson.loads(response.content)
         
         # Extract the answer from the response and return as string
         answer = result.get("response", result.get("message", ""))
@@ -79,6 +77,9 @@ def target_application_callback(query: str) -> str:
             print(f"   Response status: {e.response.status_code}")
             print(f"   Response body: {e.response.text[:200]}")
         return "I cannot process that request."
+    except orjson.JSONDecodeError as e:
+        print(f"⚠️ Invalid JSON from target application: {e}")
+        return "I cannot process that request."
 
 
 # ----------------------------------------------
@@ -0,0 +1,56 @@
+"""
+Token-caching credential shared by the scripts in this folder.
+
+Same class as CachedTokenCredential in app/core/credentials.py; the scripts
+do not install the app's dependencies, so they cannot import app/core. Keep
+the two in step.
+"""
+
+import threading
+import time
+
+from azure.core.credentials import AccessToken
+
+# Refresh cached tokens this many seconds before they expire
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+
+class CachedTokenCredential:
+    """
+    Credential wrapper that caches access tokens per scope.
+    
+    Usage:
+        credential = CachedTokenCredential(AzureDeveloperCliCredential())
+        token = credential.get_token("https://cognitiveservices.azure.com/.default")
+    """
+    
+    def __init__(self, credential):
+        """
+        Initialize the wrapper.
+        
+        Args:
+            credential: Sync azure-identity credential that fetches tokens
+        """
+        self._credential = credential
+        self._tokens: dict[tuple, AccessToken] = {}
+        self._lock = threading.Lock()
+    
+    def get_token(self, *scopes: str, **kwargs) -> AccessToken:
+        """Return a cached token for the scopes, fetching a new one near expiry."""
+        key = (scopes, kwargs.get("claims"), kwargs.get("tenant_id"))
+        with self._lock:
+            token = self._tokens.get(key)
+            if token is None or token.expires_on - TOKEN_REFRESH_MARGIN_SECONDS <= time.time():
+                token = self._credential.get_token(*scopes, **kwargs)
+                self._tokens[key] = token
+            return token
+    
+    def close(self) -> None:
+        """Close the wrapped credential."""
+        self._credential.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args) -> None:
+        self.close()
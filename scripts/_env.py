@@ -0,0 +1,35 @@
+"""
+Shared azd environment loader for the scripts in this folder.
+
+Resolves the active azd environment (AZURE_ENV_NAME, or the default in
+.azure/config.json) and loads its .env file into os.environ.
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import orjson
+from dotenv import load_dotenv
+
+AZURE_DIR = Path(__file__).parent.parent / ".azure"
+
+
+@lru_cache(maxsize=1)
+def load_azd_env() -> Path:
+    """
+    Load the azd environment's .env file once per process.
+
+    Returns:
+        Path to the environment's .env file (which may not exist)
+    """
+    env_name = os.environ.get("AZURE_ENV_NAME", "")
+    config_path = AZURE_DIR / "config.json"
+    if not env_name and config_path.exists():
+        config = orjson.loads(config_path.read_bytes())
+        env_name = config.get("defaultEnvironment", "")
+
+    env_path = AZURE_DIR / env_name / ".env"
+    if env_path.exists():
+        load_dotenv(env_path)
+    return env_path